@@ -0,0 +1,160 @@
+
+# asyncio API of the SAMAD stemmer
+#
+#   stems=await astem_many(words,"stem_di")
+#   async for stems in astream(messages,"stem_di"):
+#       ...
+#
+# Stemming is offloaded in chunks to an executor (the default executor of
+# the event loop if none is given), so that the loop keeps serving the
+# other coroutines. At most max_pending chunks are in flight: the source is
+# not read further until the oldest chunk is stemmed, and results come out
+# in input order. In a thread, the stemming of a chunk gives the interpreter
+# lock back to the loop every max_stall seconds; the deduplication of a
+# chunk is not interrupted, so chunk_size also bounds the stalls of the loop.
+
+import asyncio
+import time
+from collections import deque
+from functools import partial
+
+from SAMAD_Stemmer import Samad, check_mode
+
+
+# stemmer shared by the threads of the executors, built by _stemmer()
+_samad=None
+
+
+def _stemmer():
+    global _samad
+    if _samad is None:
+        _samad=Samad(cache_size=65536,thread_safe=True)
+    return _samad
+
+
+def _pauser(max_stall):
+    """
+    function to call regularly while holding the interpreter lock: every
+    max_stall seconds it sleeps briefly, so that a waiting event loop
+    thread takes the lock
+    """
+    if not max_stall:
+        return lambda: None
+    clock=time.perf_counter
+    deadline=[clock()+max_stall]
+    def pause():
+        if clock()>deadline[0]:
+            # sleep(0) often takes the lock back before the loop thread wakes up
+            time.sleep(1e-5)
+            deadline[0]=clock()+max_stall
+    return pause
+
+
+def _stem_words(mode,max_stall,words,pause=None):
+    """
+    stem the distinct words once, pausing every 64 words
+    """
+    stem=getattr(_stemmer(),mode)
+    pause=pause or _pauser(max_stall)
+    stems=dict.fromkeys(words)
+    for count,word in enumerate(stems):
+        stems[word]=stem(word)
+        if not count&63:
+            pause()
+    return list(map(stems.__getitem__,words))
+
+
+def _stem_documents(mode,max_stall,documents):
+    pause=_pauser(max_stall)
+    tokenize=_stemmer().tokenize
+    words=[]
+    sizes=[]
+    for document in documents:
+        if isinstance(document,str):
+            document=tokenize(document)
+        words+=document
+        sizes.append(len(document))
+        pause()
+    stems=_stem_words(mode,max_stall,words,pause)
+    stemmed=[]
+    start=0
+    for size in sizes:
+        stemmed.append(stems[start:start+size])
+        start+=size
+    return stemmed
+
+
+async def _chunked(iterable,chunk_size):
+    """
+    chunks of chunk_size items of an iterable or of an async iterable
+    """
+    chunk=[]
+    if hasattr(iterable,"__aiter__"):
+        async for item in iterable:
+            chunk.append(item)
+            if len(chunk)>=chunk_size:
+                yield chunk
+                chunk=[]
+    else:
+        for item in iterable:
+            chunk.append(item)
+            if len(chunk)>=chunk_size:
+                yield chunk
+                chunk=[]
+    if chunk:
+        yield chunk
+
+
+async def _ordered_map(function,chunks,executor,max_pending):
+    """
+    yield function(chunk) of every chunk, computed in the executor with
+    at most max_pending chunks in flight, in input order
+    """
+    loop=asyncio.get_running_loop()
+    pending=deque()
+    try:
+        async for chunk in chunks:
+            pending.append(loop.run_in_executor(executor,function,chunk))
+            if len(pending)>=max_pending:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _check(mode,chunk_size,max_pending):
+    check_mode(mode)
+    if chunk_size<1 or max_pending<1:
+        raise ValueError("chunk_size and max_pending must be positive")
+
+
+async def astem_many(words,mode="stem_di",executor=None,chunk_size=4096,max_pending=2,max_stall=0.002):
+    """
+    stem a list, an iterable or an async iterable of words in the executor,
+    chunk_size words at a time, and return the list of their stems
+    """
+    _check(mode,chunk_size,max_pending)
+    stems=[]
+    async for chunk in _ordered_map(partial(_stem_words,mode,max_stall),
+                                    _chunked(words,chunk_size),executor,max_pending):
+        stems+=chunk
+    return stems
+
+
+async def astream(documents,mode="stem_di",executor=None,chunk_size=64,max_pending=2,max_stall=0.002):
+    """
+    Stem an iterable or an async iterable of documents in the executor and
+    yield the list of stems of each document, in input order.
+
+    documents are texts (stemmed on their Arabic words, as given by
+    Samad.tokenize()) or lists of words, as in stem_corpus(), sent to
+    the executor chunk_size documents at a time. executor may be a thread
+    or a process pool; max_stall=None never gives the lock back early.
+    """
+    _check(mode,chunk_size,max_pending)
+    async for chunk in _ordered_map(partial(_stem_documents,mode,max_stall),
+                                    _chunked(documents,chunk_size),executor,max_pending):
+        for stems in chunk:
+            yield stems
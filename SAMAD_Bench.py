@@ -0,0 +1,170 @@
+
+# Benchmarks of the SAMAD stemmer on a synthetic corpus
+#
+#   python SAMAD_Bench.py [--size N] [--seed S] [--golden-out PATH] [--golden-check PATH]
+#
+# The corpus is generated deterministically from synthetic roots and the
+# affix combinations of the stemmer, so that every branch of stem and
+# stem_di is exercised. The same corpus serves as golden output: the stems
+# written by --golden-out can later be checked byte for byte by --golden-check.
+
+import argparse
+import random
+import sys
+import time
+
+from SAMAD_Stemmer import Samad
+
+
+# Arabic consonants used to build the synthetic roots
+ROOT_LETTERS=("بتثجحخدذرز"
+              "سشصضطظعغفق"
+              "كلمنه")
+
+
+def word_shapes(samad):
+    """
+    (weight, prefixes, suffixes) of the generated words, one shape per
+    branch of the stem / stem_di cascades
+    """
+    def affixes(*generated):
+        return sorted(set().union(*generated))
+
+    neg_suffs=samad.di_neg_suf1
+    return (
+        (20,affixes(samad.noun_pref_gen()),affixes(samad.noun_suff_gen(),[""])),
+        (10,affixes(samad.di_noun_pref_gen()),affixes(samad.di_noun_suff_gen(),[""])),
+        (15,affixes(samad.di_verb_pref_gen()),affixes(samad.di_verb_suff_gen(),[""])),
+        (15,affixes(samad.verb_pref_gen()),affixes(samad.verb_suff_gen())),
+        (8,affixes(samad.neg_pref_gen()),affixes(neg_suffs,[suff+neg for suff in samad.verb_suff_gen()
+                                                          for neg in neg_suffs])),
+        (10,affixes(samad.noun_joined_pref_gen()),affixes(samad.noun_suff_gen())),
+        (7,[""],affixes(samad.noun_suff_gen(),samad.di_verb_suff_gen())),
+        (15,[""],[""]),
+    )
+
+
+def generate_corpus(size,vocab_size=20000,seed=0):
+    """
+    return size words drawn with Zipfian frequencies from a vocabulary
+    of vocab_size synthetic words
+    """
+    rng=random.Random(seed)
+    shapes=word_shapes(Samad())
+    weights=[shape[0] for shape in shapes]
+
+    vocab=[]
+    for _ in range(vocab_size):
+        _,prefs,suffs=rng.choices(shapes,weights)[0]
+        root="".join(rng.choice(ROOT_LETTERS) for _ in range(rng.choice((3,3,3,4,4,5))))
+        vocab.append(rng.choice(prefs)+root+rng.choice(suffs))
+
+    zipf=[1/rank for rank in range(1,vocab_size+1)]
+    return rng.choices(vocab,zipf,k=size)
+
+
+def write_golden(path,words,samad=None):
+    """
+    write one "word<TAB>stem<TAB>stem_di" line per distinct word
+    """
+    samad=samad or Samad(cache_size=0)
+    with open(path,"w",encoding="utf-8",newline="\n") as f:
+        for word in dict.fromkeys(words):
+            f.write("%s\t%s\t%s\n" % (word,samad.stem(word),samad.stem_di(word)))
+
+
+def check_golden(path,samad=None):
+    """
+    return the (word, expected, found) stems that differ from the golden file
+    """
+    samad=samad or Samad(cache_size=0)
+    mismatches=[]
+    with open(path,encoding="utf-8",newline="\n") as f:
+        for line in f:
+            word,stem,stem_di=line.rstrip("\n").split("\t")
+            found=(samad.stem(word),samad.stem_di(word))
+            if found!=(stem,stem_di):
+                mismatches.append((word,(stem,stem_di),found))
+    return mismatches
+
+
+def benchmarks(samad):
+    """
+    name and function of each timed call
+    """
+    normalized=samad.normalize
+    return (
+        ("stem",samad.stem),
+        ("stem_di",samad.stem_di),
+        ("pref",lambda word: samad.pref(normalized(word),samad.full_prefs)),
+        ("suff",lambda word: samad.suff(normalized(word),samad.full_suffs)),
+        ("pref_tied",lambda word: samad.pref_tied(normalized(word),samad.verb_prefs,samad.verb_suffs)),
+        ("negation",lambda word: samad.negation(normalized(word))),
+    )
+
+
+def percentile(ordered,q):
+    return ordered[min(len(ordered)-1,int(q*len(ordered)))]
+
+
+def run(words,samad,latency_sample=20000):
+    """
+    time every benchmark over the words: throughput in words per second
+    and percentiles of the latency of single calls in microseconds
+    """
+    results=[]
+    sample=words[:latency_sample]
+    clock=time.perf_counter_ns
+    for name,function in benchmarks(samad):
+        start=time.perf_counter()
+        for word in words:
+            function(word)
+        elapsed=time.perf_counter()-start
+
+        latencies=[]
+        for word in sample:
+            t=clock()
+            function(word)
+            latencies.append(clock()-t)
+        latencies.sort()
+        results.append({"name":name,"words_per_second":len(words)/elapsed,
+                        "p50_us":percentile(latencies,0.50)/1000,
+                        "p90_us":percentile(latencies,0.90)/1000,
+                        "p99_us":percentile(latencies,0.99)/1000})
+    return results
+
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Benchmark the SAMAD stemmer on a synthetic corpus")
+    parser.add_argument("--size",type=int,default=200000,help="number of words (default: 200000)")
+    parser.add_argument("--vocab-size",type=int,default=20000,help="number of distinct words (default: 20000)")
+    parser.add_argument("--seed",type=int,default=0,help="seed of the corpus generator (default: 0)")
+    parser.add_argument("--cache-size",type=int,default=0,
+                        help="stem cache size of the benchmarked stemmer (default: 0, no cache)")
+    parser.add_argument("--engine",choices=sorted(Samad.engines),default="index",
+                        help="affix matching engine of the benchmarked stemmer (default: index)")
+    parser.add_argument("--golden-out",metavar="PATH",help="write the golden stems of the corpus to PATH")
+    parser.add_argument("--golden-check",metavar="PATH",help="check the stems against the golden file PATH")
+    args=parser.parse_args(argv)
+
+    if args.golden_check:
+        mismatches=check_golden(args.golden_check,Samad(args.cache_size,args.engine))
+        for word,expected,found in mismatches[:20]:
+            print("%s: expected %s, found %s" % (word,expected,found))
+        print("%d mismatches" % len(mismatches))
+        return 1 if mismatches else 0
+
+    words=generate_corpus(args.size,args.vocab_size,args.seed)
+    if args.golden_out:
+        write_golden(args.golden_out,words)
+        return 0
+
+    print("%-10s %14s %9s %9s %9s" % ("","words/s","p50 us","p90 us","p99 us"))
+    for result in run(words,Samad(args.cache_size,args.engine)):
+        print("%-10s %14.0f %9.2f %9.2f %9.2f" % (result["name"],result["words_per_second"],
+                                                  result["p50_us"],result["p90_us"],result["p99_us"]))
+    return 0
+
+
+if __name__=="__main__":
+    sys.exit(main())
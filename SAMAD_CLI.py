@@ -0,0 +1,111 @@
+
+# Command-line interface of the SAMAD stemmer
+#
+#   python SAMAD_CLI.py [--mode stem|stem_di] [--jobs N [--threads]] [-o OUTPUT] [FILE ...]
+#
+# Stems the Arabic words of the input files (or of the standard input)
+# line by line and writes the lines to OUTPUT (or to the standard output).
+
+import argparse
+import mmap
+import os
+import sys
+
+from SAMAD_Parallel import MODES, stem_texts
+
+
+def file_blocks(path,block_size):
+    """
+    yield the content of a file in blocks of about block_size bytes
+    that end at a line boundary, reading it through a memory map
+    """
+    with open(path,"rb") as f:
+        size=os.fstat(f.fileno()).st_size
+        if size==0:
+            return
+        with mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as mm:
+            start=0
+            while start<size:
+                end=start+block_size
+                if end>=size:
+                    end=size
+                else:
+                    newline=mm.find(b"\n",end)
+                    end=size if newline==-1 else newline+1
+                yield mm[start:end]
+                start=end
+
+
+def stream_blocks(stream,block_size):
+    """
+    yield the content of a binary stream in blocks of about block_size bytes
+    that end at a line boundary
+    """
+    while True:
+        block=stream.read(block_size)
+        if not block:
+            return
+        if not block.endswith(b"\n"):
+            block+=stream.readline()
+        yield block
+
+
+def input_blocks(paths,block_size):
+    if not paths:
+        yield from stream_blocks(sys.stdin.buffer,block_size)
+    for path in paths:
+        if path=="-":
+            yield from stream_blocks(sys.stdin.buffer,block_size)
+        else:
+            yield from file_blocks(path,block_size)
+
+
+def parse_args(argv=None):
+    parser=argparse.ArgumentParser(
+        description="Stem Arabic texts line by line with the SAMAD stemmer")
+    parser.add_argument("files",nargs="*",metavar="FILE",
+                        help="input files, the standard input if none or -")
+    parser.add_argument("-m","--mode",choices=MODES,default="stem",
+                        help="stem: standard Arabic, stem_di: Moroccan Arabic (default: stem)")
+    parser.add_argument("-o","--output",
+                        help="output file (default: the standard output)")
+    parser.add_argument("-j","--jobs",type=int,default=1,
+                        help="number of worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--threads",action="store_true",
+                        help="run the jobs as threads sharing one stemmer (for free-threaded Python)")
+    parser.add_argument("--block-size",type=int,default=1<<20,
+                        help="approximate number of bytes stemmed at once (default: 1048576)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args=parse_args(argv)
+    if args.block_size<1:
+        sys.exit("SAMAD_CLI.py: error: --block-size must be positive")
+    if args.jobs<0:
+        sys.exit("SAMAD_CLI.py: error: --jobs must be >= 0")
+
+    # blocks end at a newline, so they can be decoded separately;
+    # surrogateescape passes invalid UTF-8 bytes through unchanged
+    texts=(block.decode("utf-8","surrogateescape")
+           for block in input_blocks(args.files,args.block_size))
+    stemmed=stem_texts(texts,args.mode,workers=args.jobs or None,chunk_size=1,threads=args.threads)
+
+    output=open(args.output,"wb") if args.output else sys.stdout.buffer
+    try:
+        for text in stemmed:
+            output.write(text.encode("utf-8","surrogateescape"))
+        output.flush()
+    except BrokenPipeError:
+        # the reader went away (e.g. piped into head): silence the
+        # flush of the standard output at exit
+        os.dup2(os.open(os.devnull,os.O_WRONLY),sys.stdout.fileno())
+        return 1
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__=="__main__":
+    sys.exit(main())
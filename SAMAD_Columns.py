@@ -0,0 +1,71 @@
+
+# Column stemming of the SAMAD stemmer for pandas and Arrow
+#
+#   stem_column(df["text"],"stem_di")       -> pandas Series of stems
+#   stem_column(table["text"],"stem")       -> pyarrow array of stems
+#
+# The column is factorized, only its distinct values are stemmed, and the
+# result column is gathered from the stems by pandas or Arrow, without a
+# Python call per row. Missing values stay missing. pandas and pyarrow are
+# optional: each one is only needed for its own columns.
+
+try:
+    import pandas
+except ImportError:
+    pandas=None
+
+try:
+    import pyarrow
+    import pyarrow.compute
+except ImportError:
+    pyarrow=None
+
+from SAMAD_Stemmer import Samad, check_mode
+
+
+def _stem_values(values,mode,samad):
+    check_mode(mode)
+    # the values are distinct, a cache would not be hit
+    samad=samad or Samad(cache_size=0)
+    return getattr(samad,mode+"_many")(values)
+
+
+def stem_series(series,mode="stem_di",samad=None):
+    """
+    stem a pandas Series of strings into a Series of the same index and name,
+    of the same string dtype (object for the other dtypes, categories included)
+    """
+    codes,uniques=pandas.factorize(series)
+    stems=_stem_values(list(uniques),mode,samad)
+    dtype=series.dtype if isinstance(series.dtype,pandas.StringDtype) else object
+    stems=pandas.array(stems,dtype=dtype)
+    # code -1 marks the missing values
+    values=pandas.api.extensions.take(stems,codes,allow_fill=True)
+    return pandas.Series(values,index=series.index,name=series.name,dtype=dtype)
+
+
+def stem_arrow(array,mode="stem_di",samad=None):
+    """
+    stem a pyarrow string or large_string Array (or ChunkedArray)
+    into an array of the same type
+    """
+    if isinstance(array,pyarrow.ChunkedArray):
+        return pyarrow.chunked_array([stem_arrow(chunk,mode,samad) for chunk in array.chunks],array.type)
+    if not (pyarrow.types.is_string(array.type) or pyarrow.types.is_large_string(array.type)):
+        raise TypeError("expected a string or large_string array, not %s" % array.type)
+    encoded=pyarrow.compute.dictionary_encode(array)
+    stems=_stem_values(encoded.dictionary.to_pylist(),mode,samad)
+    # null indices give null stems
+    return pyarrow.compute.take(pyarrow.array(stems,array.type),encoded.indices)
+
+
+def stem_column(column,mode="stem_di",samad=None):
+    """
+    stem a pandas Series or a pyarrow Array / ChunkedArray of strings
+    with the mode ("stem" or "stem_di") and return a column of the same type
+    """
+    if pandas is not None and isinstance(column,pandas.Series):
+        return stem_series(column,mode,samad)
+    if pyarrow is not None and isinstance(column,(pyarrow.Array,pyarrow.ChunkedArray)):
+        return stem_arrow(column,mode,samad)
+    raise TypeError("expected a pandas Series or a pyarrow array, not %s" % type(column).__name__)
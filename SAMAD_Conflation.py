@@ -0,0 +1,200 @@
+
+# Conflation tables of the SAMAD stemmer: the surface forms that each stem collapses
+#
+#   table=ConflationTable("stem_di",max_forms=64)
+#   table.add_texts(texts)
+#   table.forms("كتب")           -> {"الكتب": 12, "كتبو": 3, ...}
+#   table.save("conflations.jsonl")
+#
+# max_forms bounds the surface forms kept per stem: when a stem collects
+# more than twice as many, while counting or merging, only its max_forms
+# most frequent forms are kept, and forms(), items() and save() return at
+# most max_forms forms. The total count of each stem stays exact, the
+# counts of the kept forms are lower bounds. The number of stems is not
+# bounded: the table keeps one entry per distinct stem, so its memory grows
+# with the stem vocabulary of the corpus (not with its number of words).
+# Partial tables of parallel workers are merged with merge(), or by
+# collect_conflations().
+
+import heapq
+import json
+import os
+from collections import Counter
+from functools import partial
+
+from SAMAD_Parallel import chunked, pool_map
+from SAMAD_Stemmer import Samad, check_mode
+
+
+def _rank(item):
+    # most frequent forms first, ties in the order of the forms
+    form,count=item
+    return -count,form
+
+
+class ConflationTable:
+    """
+    Streaming stem -> {surface form: count} table of one mode of the
+    stemmer, with at most max_forms forms per stem (None: no limit) and
+    one entry per distinct stem
+    """
+
+    def __init__(self,mode="stem_di",max_forms=None,samad=None):
+        check_mode(mode)
+        if max_forms is not None and max_forms<1:
+            raise ValueError("max_forms must be positive or None")
+        self.mode=mode
+        self.max_forms=max_forms
+        self.samad=samad
+        self.table={}
+        self.totals=Counter()
+
+
+    def __len__(self):
+        return len(self.table)
+
+
+    def __getstate__(self):
+        # the stemmer is rebuilt where the table is unpickled
+        state=self.__dict__.copy()
+        state["samad"]=None
+        return state
+
+
+    def add_words(self,words):
+        """
+        count the words (a list or an iterable) under their stems,
+        each distinct word is stemmed once
+        """
+        if self.samad is None:
+            self.samad=Samad(cache_size=65536)
+        stem=getattr(self.samad,self.mode)
+        self.add_counts((stem(word),word,count) for word,count in Counter(words).items())
+
+
+    def add_texts(self,texts):
+        """
+        count the Arabic words of an iterable of texts, normalized as by Samad.tokenize()
+        """
+        if self.samad is None:
+            self.samad=Samad(cache_size=65536)
+        tokenize=self.samad.tokenize
+        for text in texts:
+            self.add_words(tokenize(text))
+
+
+    def add_counts(self,counts):
+        """
+        add (stem, surface form, count) triples
+        """
+        table=self.table
+        totals=self.totals
+        for stem,form,count in counts:
+            forms=table.get(stem)
+            if forms is None:
+                forms=table[stem]={}
+            forms[form]=forms.get(form,0)+count
+            totals[stem]+=count
+            self.prune(stem,forms)
+
+
+    def prune(self,stem,forms):
+        """
+        keep the max_forms most frequent forms of the stem once it has more
+        than twice as many, the one rule of add_counts() and merge()
+        """
+        if self.max_forms and len(forms)>2*self.max_forms:
+            self.table[stem]=dict(heapq.nsmallest(self.max_forms,forms.items(),key=_rank))
+
+
+    def merge(self,other):
+        """
+        add the counts of another table of the same mode
+        """
+        if other.mode!=self.mode:
+            raise ValueError("cannot merge a %s table into a %s table" % (other.mode,self.mode))
+        table=self.table
+        for stem,forms in other.table.items():
+            mine=table.get(stem)
+            if mine is None:
+                mine=table[stem]=dict(forms)
+            else:
+                for form,count in forms.items():
+                    mine[form]=mine.get(form,0)+count
+            self.prune(stem,mine)
+        self.totals.update(other.totals)
+        return self
+
+
+    def forms(self,stem):
+        """
+        at most max_forms kept surface forms of the stem and their counts,
+        most frequent first
+        """
+        forms=sorted(self.table.get(stem,{}).items(),key=_rank)
+        return dict(forms[:self.max_forms] if self.max_forms else forms)
+
+
+    def total(self,stem):
+        """
+        exact number of words counted under the stem
+        """
+        return self.totals[stem]
+
+
+    def items(self):
+        """
+        (stem, total, forms) of every stem, most frequent stems first
+        """
+        for stem,total in self.totals.most_common():
+            yield stem,total,self.forms(stem)
+
+
+    def save(self,path):
+        """
+        write one JSON object per stem: {"stem": ..., "total": ..., "forms": {...}}
+        after a first line that records the mode and max_forms
+        """
+        with open(path,"w",encoding="utf-8",newline="\n") as f:
+            f.write(json.dumps({"mode":self.mode,"max_forms":self.max_forms})+"\n")
+            for stem,total,forms in self.items():
+                f.write(json.dumps({"stem":stem,"total":total,"forms":forms},ensure_ascii=False)+"\n")
+
+
+    @classmethod
+    def load(cls,path,samad=None):
+        """
+        read a table written by save()
+        """
+        with open(path,encoding="utf-8") as f:
+            header=json.loads(f.readline())
+            table=cls(header["mode"],header["max_forms"],samad)
+            for line in f:
+                entry=json.loads(line)
+                table.table[entry["stem"]]=entry["forms"]
+                table.totals[entry["stem"]]=entry["total"]
+        return table
+
+
+def _collect_chunk(max_forms,samad,mode,texts):
+    table=ConflationTable(mode,max_forms,samad)
+    table.add_texts(texts)
+    return table
+
+
+def collect_conflations(texts,mode="stem_di",max_forms=None,workers=None,chunk_size=1024,cache_size=65536):
+    """
+    Build the conflation table of an iterable of texts on a pool of worker
+    processes: each chunk of chunk_size texts is counted into a partial
+    table, merged into the result as soon as it is ready. At most two
+    chunks per worker are in flight.
+    """
+    check_mode(mode)
+    workers=workers or os.cpu_count() or 1
+    result=ConflationTable(mode,max_forms,Samad(cache_size))
+    if workers==1:
+        result.add_texts(texts)
+        return result
+    for table in pool_map(partial(_collect_chunk,max_forms),mode,chunked(texts,chunk_size),workers,cache_size):
+        result.merge(table)
+    return result
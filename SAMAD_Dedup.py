@@ -0,0 +1,222 @@
+
+# Near-duplicate detection of Arabic posts on stem shingles
+#
+#   detector=NearDuplicateDetector(threshold=0.8)
+#   for doc_id,duplicate_of,bands in detector.add_many(enumerate(posts)):
+#       ...
+#
+# Each post is reduced to the n-grams of the stems of its Arabic words, so
+# that posts differing by clitics and spelling variants share their
+# shingles. MinHash signatures of the shingles are computed with NumPy for
+# a batch of posts at a time, and split into LSH bands: a post is reported
+# as a near duplicate of the first post seen with one of the same bands.
+#
+# Memory does not grow with the stream: each band has a table of capacity
+# slots holding a post ID and a check value (12 bytes per slot and band),
+# so a slot shared by two different bands is taken by the latest one.
+# NumPy is required by this module only.
+
+from array import array
+from zlib import crc32
+
+try:
+    import numpy
+except ImportError:
+    numpy=None
+
+from SAMAD_Stemmer import Samad, check_mode
+
+
+# Mersenne prime of the universal hash functions of MinHash
+PRIME=(1<<61)-1
+MASK32=0xFFFFFFFF
+# multiplier combining the hashes of the stems of a shingle
+SHINGLE_MULTIPLIER=0x9E3779B1
+
+
+def lsh_bands(threshold,num_perm):
+    """
+    (bands, rows) with bands*rows<=num_perm whose S-curve threshold
+    (1/bands)**(1/rows) is the closest to threshold
+    """
+    return min(((num_perm//rows,rows) for rows in range(1,num_perm+1)),
+               key=lambda shape: abs((1/shape[0])**(1/shape[1])-threshold))
+
+
+class NearDuplicateDetector:
+    """
+    Streaming MinHash LSH over the stem n-grams (ngram stems) of texts,
+    stemmed with the mode of the stemmer. threshold is the Jaccard
+    similarity at which pairs become likely candidates; bands and rows
+    can also be given directly. Post IDs are non-negative integers
+    (-1 marks the empty slots of the band tables).
+    """
+
+    def __init__(self,threshold=0.8,num_perm=128,ngram=3,mode="stem_di",bands=None,
+                 capacity=1<<18,batch_size=1024,seed=1,samad=None):
+        if numpy is None:
+            raise ImportError("NearDuplicateDetector requires NumPy")
+        check_mode(mode)
+        if num_perm<1:
+            raise ValueError("num_perm must be positive")
+        if ngram<1:
+            raise ValueError("ngram must be positive")
+        if bands is None:
+            bands,rows=lsh_bands(threshold,num_perm)
+        elif 1<=bands<=num_perm:
+            rows=num_perm//bands
+        else:
+            raise ValueError("bands must be between 1 and num_perm")
+        self.num_perm=num_perm
+        self.ngram=ngram
+        self.mode=mode
+        self.bands=bands
+        self.rows=rows
+        self.capacity=capacity
+        self.batch_size=batch_size
+        self.samad=samad or Samad(cache_size=65536)
+
+        rng=numpy.random.default_rng(seed)
+        # a*x+b stays below 2**64 for 32-bit shingle hashes
+        self.a=rng.integers(1,1<<32,num_perm,dtype=numpy.uint64)
+        self.b=rng.integers(0,1<<32,num_perm,dtype=numpy.uint64)
+        self.band_multipliers=rng.integers(1,1<<63,rows,dtype=numpy.uint64)|numpy.uint64(1)
+
+        self.ids=numpy.full((bands,capacity),-1,dtype=numpy.int64)
+        self.checks=numpy.zeros((bands,capacity),dtype=numpy.uint32)
+
+
+    def shingle_hashes(self,texts):
+        """
+        32-bit hashes of the stem shingles of the texts, and the number of
+        shingles of each text (a text shorter than ngram stems is one shingle)
+        """
+        stem_many=getattr(self.samad,self.mode+"_many")
+        tokens=[self.samad.tokenize(text) for text in texts]
+        lengths=numpy.fromiter(map(len,tokens),dtype=numpy.int64,count=len(tokens))
+        words=[word for words in tokens for word in words]
+        stems=stem_many(words)
+        hashes=dict.fromkeys(stems)
+        for stem in hashes:
+            hashes[stem]=crc32(stem.encode("utf-8"))
+        values=numpy.frombuffer(array("I",map(hashes.__getitem__,stems)),dtype=numpy.uint32).astype(numpy.uint64)
+
+        n=self.ngram
+        ends=numpy.cumsum(lengths)
+        starts=ends-lengths
+        counts=numpy.where(lengths>=n,lengths-n+1,numpy.minimum(lengths,1))
+        if not len(values):
+            return values,counts
+
+        # shingles starting at every position, those that cross the end
+        # of their text are dropped below
+        width=min(n,int(lengths.max()))
+        positions=len(values)-width+1
+        shingles=values[:positions].copy()
+        for k in range(1,width):
+            shingles=(shingles*numpy.uint64(SHINGLE_MULTIPLIER)+values[k:k+positions])&numpy.uint64(MASK32)
+        texts_of=numpy.repeat(numpy.arange(len(lengths)),lengths)[:positions]
+        keep=numpy.arange(positions)+n<=ends[texts_of]
+        result=shingles[keep]
+
+        short=numpy.nonzero((lengths>0)&(lengths<n))[0]
+        if len(short):
+            # texts shorter than ngram stems: one shingle of all their stems,
+            # inserted where their shingles belong
+            short_hashes=[]
+            for index in short:
+                h=int(values[starts[index]])
+                for value in values[starts[index]+1:ends[index]]:
+                    h=(h*SHINGLE_MULTIPLIER+int(value))&MASK32
+                short_hashes.append(h)
+            offsets=numpy.cumsum(counts)-counts
+            result=numpy.insert(result,offsets[short]-numpy.arange(len(short)),
+                                numpy.array(short_hashes,dtype=numpy.uint64))
+        return result,counts
+
+
+    def signatures(self,texts):
+        """
+        MinHash signatures (len(texts) x num_perm, uint32) of the texts,
+        and the mask of the texts that have Arabic words
+        """
+        shingles,counts=self.shingle_hashes(texts)
+        valid=counts>0
+        signatures=numpy.zeros((len(counts),self.num_perm),dtype=numpy.uint32)
+        if not len(shingles):
+            return signatures,valid
+        starts=(numpy.cumsum(counts)-counts)[valid]
+        # a block of permutations at a time bounds the size of the hash matrix
+        block=max(1,(1<<22)//len(shingles))
+        for first in range(0,self.num_perm,block):
+            a=self.a[first:first+block,None]
+            b=self.b[first:first+block,None]
+            hashed=((a*shingles[None,:]+b)%numpy.uint64(PRIME))&numpy.uint64(MASK32)
+            signatures[valid,first:first+block]=numpy.minimum.reduceat(hashed,starts,axis=1).T
+        return signatures,valid
+
+
+    def add_many(self,posts):
+        """
+        add an iterable of (post ID, text) pairs, a batch at a time, and
+        yield (post ID, ID of the earlier near duplicate, number of shared bands)
+        for every post that has a candidate
+        """
+        batch=[]
+        for post in posts:
+            batch.append(post)
+            if len(batch)>=self.batch_size:
+                yield from self.add_batch(batch)
+                batch=[]
+        if batch:
+            yield from self.add_batch(batch)
+
+
+    def add_batch(self,batch):
+        ids=numpy.fromiter((post_id for post_id,_ in batch),dtype=numpy.int64,count=len(batch))
+        if ids.min()<0:
+            raise ValueError("post IDs must be non-negative, got %d" % ids.min())
+        signatures,valid=self.signatures([text for _,text in batch])
+        ids=ids[valid]
+        signatures=signatures[valid].astype(numpy.uint64)
+        if not len(ids):
+            return
+
+        keys=(signatures[:,:self.bands*self.rows].reshape(len(ids),self.bands,self.rows)
+              *self.band_multipliers).sum(axis=2)
+        slots=(keys%numpy.uint64(self.capacity)).astype(numpy.int64)
+        checks=(keys>>numpy.uint64(32)).astype(numpy.uint32)
+        candidates=numpy.full((len(ids),self.bands),-1,dtype=numpy.int64)
+
+        for band in range(self.bands):
+            table_ids=self.ids[band]
+            table_checks=self.checks[band]
+            band_slots=slots[:,band]
+            # posts of earlier batches
+            found=table_ids[band_slots]
+            matched=(found>=0)&(table_checks[band_slots]==checks[:,band])
+            candidates[matched,band]=found[matched]
+            # first post of this batch with the same band
+            _,first,inverse=numpy.unique(keys[:,band],return_index=True,return_inverse=True)
+            first_post=first[inverse.reshape(-1)]
+            later=~matched&(first_post!=numpy.arange(len(ids)))
+            candidates[later,band]=ids[first_post[later]]
+            # new bands keep the first post that had them
+            new=~matched&~later
+            table_ids[band_slots[new]]=ids[new]
+            table_checks[band_slots[new]]=checks[new,band]
+
+        for index in numpy.nonzero((candidates>=0).any(axis=1))[0]:
+            found=candidates[index][candidates[index]>=0]
+            values,shared=numpy.unique(found,return_counts=True)
+            best=shared.argmax()
+            yield int(ids[index]),int(values[best]),int(shared[best])
+
+
+def find_duplicates(texts,threshold=0.8,**options):
+    """
+    (index, index of the earlier near duplicate, shared bands) of the texts
+    of an iterable that have a near duplicate before them
+    """
+    detector=NearDuplicateDetector(threshold,**options)
+    return detector.add_many(enumerate(texts))
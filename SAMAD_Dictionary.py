@@ -0,0 +1,279 @@
+
+# Persistent surface -> stem dictionaries of the SAMAD stemmer
+#
+#   python SAMAD_Dictionary.py build [--mode stem|stem_di] -o PATH [VOCABULARY ...]
+#   python SAMAD_Dictionary.py lookup PATH WORD ...
+#
+# A dictionary stores the stems of a fixed vocabulary for one mode, so that
+# they are computed once. The file is read through a memory map: processes
+# that open the same dictionary share its pages and load it instantly.
+#
+# File layout (little-endian):
+#   header        magic, version, number of words, number of slots, size of the two blobs,
+#                 mode and fingerprint of the affix tables (see Samad.fingerprint())
+#   word offsets  number of words + 1 unsigned 32-bit integers
+#   stem offsets  number of words + 1 unsigned 32-bit integers
+#   slots         open-addressing hash table of word indexes (CRC-32 of the word,
+#                 linear probing, EMPTY for free slots), a power of two at least
+#                 twice the number of words
+#   word blob     UTF-8 words, sorted bytewise
+#   stem blob     UTF-8 stems, in the order of the words
+
+import argparse
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+
+from SAMAD_Stemmer import MODES, Samad, check_mode
+
+
+MAGIC=b"SAMADDIC"
+VERSION=2
+HEADER=struct.Struct("<8sIIIQQ8s40s")
+EMPTY=0xFFFFFFFF
+
+
+def build_dictionary(words,path,mode="stem_di",samad=None):
+    """
+    stem the distinct words with the mode of samad and write them to path;
+    return the number of words written
+    """
+    check_mode(mode)
+    samad=samad or Samad(cache_size=0)
+    keys=sorted(set(word.encode("utf-8") for word in words))
+    stems=[stem.encode("utf-8") for stem in
+           getattr(samad,mode+"_many")([key.decode("utf-8") for key in keys])]
+
+    key_offsets=offset_array(keys)
+    stem_offsets=offset_array(stems)
+    slots=slot_array(keys)
+    with open(path,"wb") as f:
+        f.write(HEADER.pack(MAGIC,VERSION,len(keys),len(slots),key_offsets[-1],stem_offsets[-1],
+                            mode.encode("ascii"),samad.fingerprint().encode("ascii")))
+        f.write(key_offsets.tobytes())
+        f.write(stem_offsets.tobytes())
+        f.write(slots.tobytes())
+        f.writelines(keys)
+        f.writelines(stems)
+    return len(keys)
+
+
+def offset_array(blobs):
+    """
+    little-endian array of the start offsets of the blobs followed by their total size
+    """
+    result=array("I",[0])
+    total=0
+    for blob in blobs:
+        total+=len(blob)
+        result.append(total)
+    if total>=1<<32:
+        raise ValueError("a dictionary holds at most 4 GiB of words or of stems")
+    if sys.byteorder!="little":
+        result.byteswap()
+    return result
+
+
+def slot_array(keys):
+    """
+    little-endian hash table of the indexes of the keys
+    """
+    size=2
+    while size<2*len(keys):
+        size*=2
+    mask=size-1
+    slots=array("I",[EMPTY])*size
+    for index,key in enumerate(keys):
+        slot=zlib.crc32(key)&mask
+        while slots[slot]!=EMPTY:
+            slot=(slot+1)&mask
+        slots[slot]=index
+    if sys.byteorder!="little":
+        slots.byteswap()
+    return slots
+
+
+class StemDictionary:
+    """
+    Read-only surface -> stem dictionary built by build_dictionary(),
+    looked up through the hash table of its memory map. ValueError if
+    it was not built for the mode or with the affix tables of the
+    fingerprint, when they are given.
+    """
+
+    def __init__(self,path,mode=None,fingerprint=None):
+        with open(path,"rb") as f:
+            self.map=mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+        try:
+            slots,keys_size=self.read_header(path,mode,fingerprint)
+        except ValueError:
+            self.map.close()
+            raise
+
+        start=HEADER.size
+        size=4*(self.count+1)
+        self.key_offsets=self.read_array(start,size)
+        self.stem_offsets=self.read_array(start+size,size)
+        self.slots=self.read_array(start+2*size,4*slots)
+        self.mask=slots-1
+        self.keys_start=start+2*size+4*slots
+        self.stems_start=self.keys_start+keys_size
+
+
+    def read_header(self,path,mode,fingerprint):
+        """
+        check the header and return the number of slots and the size of the word blob
+        """
+        if len(self.map)<HEADER.size or self.map[:len(MAGIC)]!=MAGIC:
+            raise ValueError("%s is not a SAMAD dictionary" % path)
+        _,version,self.count,slots,keys_size,_,built_mode,built_fingerprint=HEADER.unpack_from(self.map)
+        if version!=VERSION:
+            raise ValueError("%s is a dictionary of version %r, not %r" % (path,version,VERSION))
+        self.mode=built_mode.rstrip(b"\0").decode("ascii")
+        self.fingerprint=built_fingerprint.decode("ascii")
+        if mode is not None and mode!=self.mode:
+            raise ValueError("%s is a dictionary of mode %s, not %s" % (path,self.mode,mode))
+        if fingerprint is not None and fingerprint!=self.fingerprint:
+            raise ValueError("%s was built with other affix tables" % path)
+        return slots,keys_size
+
+
+    def read_array(self,start,size):
+        if sys.byteorder=="little":
+            return memoryview(self.map)[start:start+size].cast("I")
+        # big-endian hosts pay one copy of the array
+        swapped=array("I",self.map[start:start+size])
+        swapped.byteswap()
+        return swapped
+
+
+    def __len__(self):
+        return self.count
+
+
+    def get(self,word,default=None):
+        """
+        stem of the word, or default if the word is not in the dictionary
+        """
+        key=word.encode("utf-8")
+        data=self.map
+        offsets=self.key_offsets
+        slots=self.slots
+        mask=self.mask
+        base=self.keys_start
+        slot=zlib.crc32(key)&mask
+        index=slots[slot]
+        while index!=EMPTY:
+            if data[base+offsets[index]:base+offsets[index+1]]==key:
+                base=self.stems_start
+                return data[base+self.stem_offsets[index]:base+self.stem_offsets[index+1]].decode("utf-8")
+            slot=(slot+1)&mask
+            index=slots[slot]
+        return default
+
+
+    def __contains__(self,word):
+        return self.get(word) is not None
+
+
+    def close(self):
+        # the offset views must be released before the map can be closed
+        for view in (self.key_offsets,self.stem_offsets,self.slots):
+            if isinstance(view,memoryview):
+                view.release()
+        self.map.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self,*exc_info):
+        self.close()
+
+
+class DictionaryStemmer:
+    """
+    Stemmer that looks words up in the dictionaries of each mode before
+    falling back to the rules of samad; the dictionaries must have been
+    built for their mode with the affix tables of samad
+    """
+
+    def __init__(self,stem=None,stem_di=None,samad=None):
+        self.samad=samad or Samad()
+        fingerprint=self.samad.fingerprint()
+        self.dictionaries={mode:StemDictionary(path,mode,fingerprint) if path else None
+                           for mode,path in (("stem",stem),("stem_di",stem_di))}
+
+
+    def stem(self,word):
+        dictionary=self.dictionaries["stem"]
+        stem=dictionary.get(word) if dictionary is not None else None
+        return self.samad.stem(word) if stem is None else stem
+
+
+    def stem_di(self,word):
+        dictionary=self.dictionaries["stem_di"]
+        stem=dictionary.get(word) if dictionary is not None else None
+        return self.samad.stem_di(word) if stem is None else stem
+
+
+    def stem_many(self,words):
+        return Samad.unique_map(self.stem,words)
+
+
+    def stem_di_many(self,words):
+        return Samad.unique_map(self.stem_di,words)
+
+
+    def close(self):
+        for dictionary in self.dictionaries.values():
+            if dictionary is not None:
+                dictionary.close()
+
+
+def read_vocabulary(paths):
+    """
+    words of the vocabulary files, one word per line
+    """
+    for path in paths or ["-"]:
+        f=sys.stdin if path=="-" else open(path,encoding="utf-8")
+        try:
+            for line in f:
+                word=line.strip()
+                if word:
+                    yield word
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Build or query SAMAD stem dictionaries")
+    commands=parser.add_subparsers(dest="command",required=True)
+    build=commands.add_parser("build",help="stem a vocabulary into a dictionary")
+    build.add_argument("vocabulary",nargs="*",metavar="VOCABULARY",
+                       help="files of one word per line, the standard input if none or -")
+    build.add_argument("-m","--mode",choices=MODES,default="stem_di",
+                       help="stem: standard Arabic, stem_di: Moroccan Arabic (default: stem_di)")
+    build.add_argument("-o","--output",required=True,help="dictionary file")
+    lookup=commands.add_parser("lookup",help="print the stems of words found in a dictionary")
+    lookup.add_argument("dictionary")
+    lookup.add_argument("words",nargs="+",metavar="WORD")
+    args=parser.parse_args(argv)
+
+    if args.command=="build":
+        count=build_dictionary(read_vocabulary(args.vocabulary),args.output,args.mode)
+        print("%d words written to %s" % (count,args.output),file=sys.stderr)
+        return 0
+
+    with StemDictionary(args.dictionary) as dictionary:
+        for word in args.words:
+            print("%s\t%s" % (word,dictionary.get(word,"")))
+    return 0
+
+
+if __name__=="__main__":
+    sys.exit(main())
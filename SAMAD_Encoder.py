@@ -0,0 +1,158 @@
+
+# Stem ID encoding of the SAMAD stemmer, for feature pipelines
+#
+#   encoder=StemEncoder("stem_di")
+#   ids,offsets=encoder.encode_batch(["ماكنعرفش هاد الكتاب","كنقراو الكتب"])
+#   ids[offsets[1]:offsets[2]]   -> IDs of the stems of the second document
+#   encoder.freeze(); encoder.save("vocabulary.json")
+#
+# Stems get stable integer IDs in the order they are first seen, ID 0 being
+# reserved for out-of-vocabulary stems of a frozen vocabulary. The encoder
+# remembers the ID of each surface word, so words seen before are neither
+# stemmed again nor turned into new stem strings.
+
+import json
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy=None
+
+from SAMAD_Stemmer import Samad, check_mode
+
+
+OOV="<oov>"
+
+
+class StemEncoder:
+    """
+    Vocabulary of the stems of one mode of the stemmer. A frozen vocabulary
+    maps new stems to oov_id (0) instead of giving them new IDs.
+    The surface word -> ID memory is cleared when a batch would take it
+    beyond max_words words.
+    """
+
+    oov_id=0
+
+    def __init__(self,mode="stem_di",frozen=False,samad=None,max_words=1<<20):
+        check_mode(mode)
+        self.mode=mode
+        self.frozen=frozen
+        # the IDs of the words are remembered here, the stemmer needs no cache
+        self.samad=samad or Samad(cache_size=0)
+        self.max_words=max_words
+        self.stems=[OOV]
+        self.ids={}
+        self.word_ids={}
+
+
+    def __len__(self):
+        """
+        number of IDs, the OOV ID included
+        """
+        return len(self.stems)
+
+
+    def freeze(self):
+        self.frozen=True
+
+
+    def stem_id(self,stem):
+        """
+        ID of the stem, a new one if the vocabulary is not frozen
+        """
+        stem_id=self.ids.get(stem)
+        if stem_id is None:
+            if self.frozen:
+                return self.oov_id
+            stem_id=self.ids[stem]=len(self.stems)
+            self.stems.append(stem)
+        return stem_id
+
+
+    def learn(self,words):
+        """
+        remember the IDs of the words that are not known yet
+        """
+        word_ids=self.word_ids
+        missing=[word for word in dict.fromkeys(words) if word not in word_ids]
+        if not missing:
+            return
+        if len(word_ids)+len(missing)>self.max_words:
+            word_ids.clear()
+            missing=list(dict.fromkeys(words))
+        stems=getattr(self.samad,self.mode+"_many")(missing)
+        for word,stem in zip(missing,stems):
+            word_ids[word]=self.stem_id(stem)
+
+
+    def words(self,document):
+        if isinstance(document,str):
+            return self.samad.tokenize(document)
+        return document
+
+
+    def encode(self,document):
+        """
+        array("I") of the stem IDs of the words of a document
+        (a string, whose Arabic words are encoded, or a list of words)
+        """
+        words=self.words(document)
+        self.learn(words)
+        return array("I",map(self.word_ids.__getitem__,words))
+
+
+    def encode_batch(self,documents,as_numpy=False):
+        """
+        encode a list or an iterable of documents into one array("I") of
+        stem IDs and an array("Q") of len(documents)+1 offsets: the IDs of
+        document i are ids[offsets[i]:offsets[i+1]].
+        as_numpy=True returns NumPy arrays sharing the same buffers.
+        """
+        words=[]
+        offsets=array("Q",[0])
+        for document in documents:
+            words+=self.words(document)
+            offsets.append(len(words))
+        self.learn(words)
+        ids=array("I",map(self.word_ids.__getitem__,words))
+        if as_numpy:
+            if numpy is None:
+                raise ImportError("as_numpy=True requires NumPy")
+            return numpy.frombuffer(ids,numpy.uint32),numpy.frombuffer(offsets,numpy.uint64)
+        return ids,offsets
+
+
+    def decode(self,ids):
+        """
+        stems of the IDs
+        """
+        stems=self.stems
+        return [stems[stem_id] for stem_id in ids]
+
+
+    def save(self,path):
+        """
+        write the vocabulary to a JSON file, the stem of ID i at index i
+        """
+        state={"mode":self.mode,"frozen":self.frozen,
+               "fingerprint":self.samad.fingerprint(),"stems":self.stems}
+        with open(path,"w",encoding="utf-8",newline="\n") as f:
+            json.dump(state,f,ensure_ascii=False)
+
+
+    @classmethod
+    def load(cls,path,samad=None,frozen=None):
+        """
+        read a vocabulary written by save(), frozen as it was saved unless
+        frozen is given; ValueError if its stems come from other affix tables
+        """
+        with open(path,encoding="utf-8") as f:
+            state=json.load(f)
+        encoder=cls(state["mode"],state["frozen"] if frozen is None else frozen,samad)
+        if state["fingerprint"]!=encoder.samad.fingerprint():
+            raise ValueError("%s was built with other affix tables" % path)
+        encoder.stems=state["stems"]
+        encoder.ids={stem:stem_id for stem_id,stem in enumerate(encoder.stems) if stem_id!=cls.oov_id}
+        return encoder
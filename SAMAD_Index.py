@@ -0,0 +1,178 @@
+
+# In-memory inverted index of stemmed documents
+#
+#   index=StemIndex("stem_di")
+#   index.add_many([(1,"ماكنعرفش هاد الكتاب"),(2,"كنقراو الكتب")])
+#   index.query("الكتاب")        -> [1]
+#   index.save("posts.idx"); StemIndex.load("posts.idx")
+#
+# Documents are stemmed with the rules of one mode of the stemmer as they
+# are added; queries are stemmed with the same rules, so that they match
+# every surface form of their stems. Each stem keeps the sorted IDs of its
+# documents in an unsigned 32-bit array.
+
+import pickle
+from array import array
+from bisect import bisect_left, insort
+from itertools import islice
+
+from SAMAD_Stemmer import Samad, check_mode
+
+
+VERSION=1
+
+
+class StemIndex:
+    """
+    Inverted index from the stems of a mode to the IDs of the documents
+    that contain them. Document IDs are integers from 0 to 2**32-1;
+    documents are strings (their Arabic words are indexed) or lists of words.
+    """
+
+    def __init__(self,mode="stem_di",samad=None):
+        check_mode(mode)
+        self.mode=mode
+        self.samad=samad or Samad(cache_size=65536)
+        self.postings={}
+        # distinct stems of each document, to remove it
+        self.documents={}
+
+
+    def __len__(self):
+        return len(self.documents)
+
+
+    def __contains__(self,doc_id):
+        return doc_id in self.documents
+
+
+    def words(self,document):
+        if isinstance(document,str):
+            return self.samad.tokenize(document)
+        return document
+
+
+    def stem_words(self,words):
+        return getattr(self.samad,self.mode+"_many")(words)
+
+
+    def add(self,doc_id,document):
+        """
+        index the document under doc_id, replacing the document already indexed under it
+        """
+        self.add_many(((doc_id,document),))
+
+
+    def add_many(self,documents,chunk_size=1024):
+        """
+        index an iterable of (doc_id, document) pairs, with one batch
+        stemming call per chunk of chunk_size documents
+        """
+        documents=iter(documents)
+        while True:
+            chunk=list(islice(documents,chunk_size))
+            if not chunk:
+                return
+            words=[]
+            sizes=[]
+            for _,document in chunk:
+                document=self.words(document)
+                words+=document
+                sizes.append(len(document))
+            stems=self.stem_words(words)
+            start=0
+            for (doc_id,_),size in zip(chunk,sizes):
+                self.index(doc_id,stems[start:start+size])
+                start+=size
+
+
+    def index(self,doc_id,stems):
+        if doc_id in self.documents:
+            self.remove(doc_id)
+        stems=tuple(dict.fromkeys(stems))
+        postings=self.postings
+        for stem in stems:
+            ids=postings.get(stem)
+            if ids is None:
+                postings[stem]=array("I",(doc_id,))
+            elif ids[-1]<doc_id:
+                ids.append(doc_id)
+            else:
+                insort(ids,doc_id)
+        self.documents[doc_id]=stems
+
+
+    def remove(self,doc_id):
+        """
+        remove the document from the index, KeyError if it is not indexed
+        """
+        postings=self.postings
+        for stem in self.documents.pop(doc_id):
+            ids=postings[stem]
+            if len(ids)==1:
+                del postings[stem]
+            else:
+                del ids[bisect_left(ids,doc_id)]
+
+
+    def lookup(self,stem):
+        """
+        sorted IDs of the documents that contain the stem,
+        as an array("I") that must not be modified
+        """
+        return self.postings.get(stem,array("I"))
+
+
+    def query(self,text,operator="and"):
+        """
+        sorted IDs of the documents that contain the stems of all ("and")
+        or of any ("or") of the words of the text (a string or a list of words)
+        """
+        if operator not in ("and","or"):
+            raise ValueError("operator must be 'and' or 'or', not %r" % operator)
+        stems=set(self.stem_words(self.words(text)))
+        if not stems:
+            return []
+        lists=sorted((self.lookup(stem) for stem in stems),key=len)
+        if operator=="or":
+            return sorted(set().union(*lists))
+        ids=set(lists[0])
+        for other in lists[1:]:
+            if not ids:
+                break
+            ids.intersection_update(other)
+        return sorted(ids)
+
+
+    def stems(self):
+        """
+        indexed stems and the number of documents that contain each one
+        """
+        return {stem:len(ids) for stem,ids in self.postings.items()}
+
+
+    def save(self,path):
+        """
+        write the index to path, with the fingerprint of the affix tables
+        """
+        state=(VERSION,self.samad.fingerprint(),self.mode,self.postings,self.documents)
+        with open(path,"wb") as f:
+            pickle.dump(state,f,protocol=pickle.HIGHEST_PROTOCOL)
+
+
+    @classmethod
+    def load(cls,path,samad=None):
+        """
+        read an index written by save(); ValueError if it was built
+        with other affix tables than those of samad
+        """
+        with open(path,"rb") as f:
+            version,fingerprint,mode,postings,documents=pickle.load(f)
+        if version!=VERSION:
+            raise ValueError("%s is an index of version %r, not %r" % (path,version,VERSION))
+        index=cls(mode,samad)
+        if fingerprint!=index.samad.fingerprint():
+            raise ValueError("%s was built with other affix tables" % path)
+        index.postings=postings
+        index.documents=documents
+        return index
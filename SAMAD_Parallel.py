@@ -0,0 +1,163 @@
+
+# Multi-core corpus stemming with the SAMAD stemmer
+#
+# The work is spread on a pool of processes, or with threads=True on a pool
+# of threads that share one thread-safe stemmer and its caches: no pickling
+# and a single copy of the tables, which uses every core on free-threaded
+# builds of Python (3.13t and later) and only one core otherwise.
+#
+# pool_map() with init_worker(), run_task() and chunked() is the process
+# pool that the other modules of the stemmer share.
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from multiprocessing import Pool
+
+from SAMAD_Stemmer import MODES, Samad, check_mode
+
+
+# stemmer of the current worker process, built once by init_worker()
+_worker_samad=None
+
+
+def init_worker(cache_size):
+    """
+    initializer of the worker processes of pool_map(), also usable with 
+    other process pools: build the stemmer of the worker once
+    """
+    global _worker_samad
+    _worker_samad=Samad(cache_size)
+
+
+def run_task(task,mode,chunk):
+    """
+    task(samad,mode,chunk) with the stemmer of the worker process, which 
+    init_worker() must have built
+    """
+    return task(_worker_samad,mode,chunk)
+
+
+def stem_documents(samad,mode,documents):
+    """
+    stem a list of documents, each one a text (its Arabic words, see 
+    Samad.tokenize()) or a list of words, with one deduplicated batch 
+    call for all their words
+    """
+    words=[]
+    sizes=[]
+    for document in documents:
+        if isinstance(document,str):
+            document=samad.tokenize(document)
+        words+=document
+        sizes.append(len(document))
+
+    stems=getattr(samad,mode+"_many")(words)
+
+    stemmed=[]
+    start=0
+    for size in sizes:
+        stemmed.append(stems[start:start+size])
+        start+=size
+    return stemmed
+
+
+def _stem_text_chunk(samad,mode,texts):
+    return list(map(getattr(samad,mode+"_text"),texts))
+
+
+def chunked(iterable,chunk_size):
+    """
+    lists of chunk_size items of an iterable, the last one shorter
+    """
+    iterator=iter(iterable)
+    while True:
+        chunk=list(islice(iterator,chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def pool_map(task,mode,chunks,workers,cache_size):
+    """
+    run task(samad,mode,chunk) on a pool of worker processes, each with
+    its own stemmer of cache_size words, and yield the results in input
+    order, with at most two chunks per worker in flight
+    """
+    # compile the affix tables before the workers are forked so that
+    # they inherit them instead of compiling them again
+    Samad(0)
+    with Pool(workers,init_worker,(cache_size,)) as pool:
+        pending=deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(run_task,(task,mode,chunk)))
+            if len(pending)>=2*workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def _thread_map(task,chunks,workers):
+    """
+    run task(chunk) on a pool of threads and yield the results in 
+    input order, with at most two chunks per thread in flight
+    """
+    with ThreadPoolExecutor(workers) as executor:
+        pending=deque()
+        for chunk in chunks:
+            pending.append(executor.submit(task,chunk))
+            if len(pending)>=2*workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def stem_corpus(documents,mode="stem_di",workers=None,chunk_size=256,cache_size=65536,threads=False):
+    """
+    Stem an iterable of documents on a pool of worker processes and yield
+    the list of stems of each document, in input order.
+
+    documents are texts (stemmed on their Arabic words, as given by
+    Samad.tokenize()) or lists of words,
+    mode is "stem" (standard Arabic) or "stem_di" (Moroccan Arabic),
+    workers defaults to the number of CPUs and chunk_size is the number
+    of documents sent to a worker at once. At most two chunks per worker
+    are in flight, so the corpus is never loaded whole in memory.
+    threads=True runs the workers as threads of this process.
+    """
+    check_mode(mode)
+    workers=workers or os.cpu_count() or 1
+
+    chunks=chunked(documents,chunk_size)
+    if workers==1:
+        samad=Samad(cache_size)
+        chunks=(stem_documents(samad,mode,chunk) for chunk in chunks)
+    elif threads:
+        samad=Samad(cache_size,thread_safe=True)
+        chunks=_thread_map(lambda chunk: stem_documents(samad,mode,chunk),chunks,workers)
+    else:
+        chunks=pool_map(stem_documents,mode,chunks,workers,cache_size)
+    for stems in chunks:
+        yield from stems
+
+
+def stem_texts(texts,mode="stem_di",workers=None,chunk_size=64,cache_size=65536,threads=False):
+    """
+    Like stem_corpus(), but yield each text with its Arabic words replaced 
+    by their stems, as Samad.stem_text() and Samad.stem_di_text() do
+    """
+    check_mode(mode)
+    workers=workers or os.cpu_count() or 1
+
+    if workers==1:
+        yield from map(getattr(Samad(cache_size),mode+"_text"),texts)
+        return
+    if threads:
+        samad=Samad(cache_size,thread_safe=True)
+        chunks=_thread_map(lambda chunk: _stem_text_chunk(samad,mode,chunk),
+                           chunked(texts,chunk_size),workers)
+    else:
+        chunks=pool_map(_stem_text_chunk,mode,chunked(texts,chunk_size),workers,cache_size)
+    for stems in chunks:
+        yield from stems
@@ -0,0 +1,240 @@
+
+# Affix profiles of the SAMAD stemmer
+#
+#   Stemmer=profile_stemmer("algerian.json")      # or "standard", "moroccan"
+#   Stemmer().stem_di(word)
+#
+# A profile declares, in a JSON file or a dict:
+#   classes   base affix classes: name -> list of affixes
+#   rules     combinations: name -> list of sequences of class names, each
+#             sequence giving every concatenation of one affix of each class
+#   tables    matching tables of the stemmer (Samad.table_names):
+#             name -> list of the rules and classes whose affixes it holds
+#   include   profiles (built-in names or paths) that it extends: their
+#             classes, rules and tables are kept unless it redefines them
+# The classes that no profile declares are those of Samad (noun_pre1 ...
+# di_neg_suf1), and the tables that a profile does not define are empty.
+# The compiled tables are cached on disk under the hash of the resolved
+# profile, in $SAMAD_PROFILE_CACHE or ~/.cache/samad.
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from itertools import product
+
+from SAMAD_Stemmer import Samad
+
+
+VERSION=1
+
+CACHE_DIR=os.environ.get("SAMAD_PROFILE_CACHE") or os.path.join(os.path.expanduser("~"),".cache","samad")
+
+
+# the combinations of Samad.noun_pref_gen() ... Samad.verb_suff_gen()
+STANDARD={
+    "name":"standard",
+    "rules":{
+        "noun_prefs":[["noun_pre1"],["noun_pre3","noun_pre1"],["noun_pre4","noun_pre1"],
+                      ["noun_pre4","noun_pre3","noun_pre1"],["noun_pre2"],["noun_pre4","noun_pre2"]],
+        "noun_suffs":[["noun_suf1","noun_suf2"],["noun_suf1"],["noun_suf2"],["noun_suf3"]],
+        "noun_joined_prefs":[["noun_pre4","noun_pre5"],["noun_pre3"],["noun_pre4"],["noun_pre5"]],
+        "verb_prefs":[["verb_pre1"],["verb_pre2","verb_pre1"],["verb_pre3","verb_pre2","verb_pre1"],
+                      ["verb_pre3","verb_pre1"]],
+        "verb_suffs":[["verb_suf1","verb_suf3"],["verb_suf1","verb_suf4"],["verb_suf1","verb_suf5"],
+                      ["verb_suf1","verb_suf6"],["verb_suf2","verb_suf3"],["verb_suf2","verb_suf4"],
+                      ["verb_suf2","verb_suf5"],["verb_suf3","verb_suf5"],["verb_suf3","verb_suf6"],
+                      ["verb_suf1"],["verb_suf2"],["verb_suf5"],["verb_suf6"],["verb_suf7"],
+                      ["verb_suf3"],["verb_suf4"]],
+    },
+    "tables":{
+        "noun_prefs":["noun_prefs"],
+        "noun_suffs":["noun_suffs"],
+        "verb_prefs":["verb_prefs"],
+        "verb_suffs":["verb_suffs"],
+        "noun_joined_suffs":["noun_suf2","noun_suf3"],
+        "noun_joined_prefs":["noun_joined_prefs"],
+        "standard_suffs":["noun_suffs","verb_suffs"],
+        "standard_prefs":["noun_prefs","verb_prefs"],
+    },
+}
+
+# the combinations of Samad.di_noun_pref_gen() ... Samad.neg_pref_gen()
+MOROCCAN={
+    "name":"moroccan",
+    "include":["standard"],
+    "rules":{
+        "di_noun_prefs":[["di_noun_pre2","di_noun_pre1"],["di_noun_pre3","di_noun_pre2","di_noun_pre1"]],
+        "di_noun_suffs":[["di_noun_suf1","di_noun_suf4"],["di_noun_suf2","di_noun_suf4"],
+                         ["di_noun_suf3","di_noun_suf4"],["di_noun_suf1","di_noun_suf5"],
+                         ["di_noun_suf3","di_noun_suf5"],["di_noun_suf2","di_noun_suf6"],
+                         ["di_noun_suf1"],["di_noun_suf2"],["di_noun_suf3"],
+                         ["di_noun_suf4"],["di_noun_suf5"],["di_noun_suf6"]],
+        "di_verb_prefs":[["di_verb_pre1","di_verb_pre2"],["di_verb_pre3","di_verb_pre1","di_verb_pre2"]],
+        "di_verb_suffs":[["di_verb_suf1","di_verb_suf4"],["di_verb_suf1","di_verb_suf5"],
+                         ["di_verb_suf6","di_verb_suf5"],["di_verb_suf6","di_verb_suf1"],
+                         ["di_verb_suf1","di_verb_suf6","di_verb_suf1"],
+                         ["di_verb_suf2","di_verb_suf4"],["di_verb_suf2","di_verb_suf5"],
+                         ["di_verb_suf2","di_verb_suf6","di_verb_suf5"],["di_verb_suf2","di_verb_suf8"],
+                         ["di_verb_suf2","di_verb_suf6","di_verb_suf8"],
+                         ["di_verb_suf2","di_verb_suf6","di_verb_suf9"],
+                         ["di_verb_suf3","di_verb_suf7"],["di_verb_suf3","di_verb_suf6","di_verb_suf7"],
+                         ["di_verb_suf3","di_verb_suf8"],["di_verb_suf3","di_verb_suf6","di_verb_suf9"],
+                         ["di_verb_suf1","di_verb_suf7"],["di_verb_suf5","di_verb_suf7"],
+                         ["di_verb_suf6","di_verb_suf7"],["di_verb_suf5","di_verb_suf6","di_verb_suf7"],
+                         ["di_verb_suf1","di_verb_suf8"],["di_verb_suf5","di_verb_suf8"],
+                         ["di_verb_suf6","di_verb_suf8"],["di_verb_suf1","di_verb_suf6","di_verb_suf8"],
+                         ["di_verb_suf8","di_verb_suf6","di_verb_suf8"],
+                         ["di_verb_suf1"],["di_verb_suf2"],["di_verb_suf3"],["di_verb_suf4"],
+                         ["di_verb_suf5"],["di_verb_suf7"],["di_verb_suf8"]],
+        "neg_prefs":[["di_neg_pre2","di_neg_pre4"],["di_neg_pre2","di_neg_pre3","di_neg_pre4"],
+                     ["di_neg_pre1","di_neg_pre2"],["di_neg_pre1","di_neg_pre2","di_neg_pre4"],
+                     ["di_neg_pre1","di_neg_pre2","di_neg_pre3","di_neg_pre4"],["di_neg_pre2"]],
+    },
+    "tables":{
+        "di_noun_prefs":["di_noun_prefs","noun_prefs"],
+        "di_noun_suffs":["di_noun_suffs","noun_suffs"],
+        "di_verb_prefs":["di_verb_prefs"],
+        "di_verb_suffs":["di_verb_suffs","verb_suffs"],
+        "neg_prefs":["neg_prefs"],
+        "neg_suffs":["di_neg_suf1"],
+        "full_suffs":["noun_suffs","di_noun_suffs","verb_suffs","di_verb_suffs"],
+        "full_prefs":["noun_prefs","di_noun_prefs","verb_prefs","di_verb_prefs"],
+    },
+}
+
+BUILTIN={profile["name"]:profile for profile in (STANDARD,MOROCCAN)}
+
+
+class AffixProfile:
+    """
+    Declarative affix classes, combination rules and matching tables,
+    merged with those of the included profiles
+    """
+
+    def __init__(self,name,classes=None,rules=None,tables=None,include=()):
+        self.name=name
+        self.classes={}
+        self.rules={}
+        self.tables={}
+        for included in include:
+            included=self.get(included)
+            self.classes.update(included.classes)
+            self.rules.update(included.rules)
+            self.tables.update(included.tables)
+        self.classes.update({key:tuple(affixes) for key,affixes in (classes or {}).items()})
+        self.rules.update({key:[list(sequence) for sequence in sequences] for key,sequences in (rules or {}).items()})
+        self.tables.update({key:list(sources) for key,sources in (tables or {}).items()})
+        unknown=set(self.tables)-set(Samad.table_names)
+        if unknown:
+            raise ValueError("profile %s defines unknown tables: %s" % (name,", ".join(sorted(unknown))))
+
+
+    @classmethod
+    def from_dict(cls,profile):
+        return cls(profile.get("name","profile"),profile.get("classes"),profile.get("rules"),
+                   profile.get("tables"),profile.get("include",()))
+
+
+    @classmethod
+    def load(cls,path):
+        """
+        read a profile from a JSON file
+        """
+        with open(path,encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+    @classmethod
+    def get(cls,profile):
+        """
+        profile given as an AffixProfile, a dict, a built-in name or a path
+        """
+        if isinstance(profile,AffixProfile):
+            return profile
+        if isinstance(profile,dict):
+            return cls.from_dict(profile)
+        if profile in BUILTIN:
+            return cls.from_dict(BUILTIN[profile])
+        return cls.load(profile)
+
+
+    def resolve(self,base=Samad):
+        """
+        affixes of every class used by the rules and the tables,
+        taken from the profile or else from the attributes of base
+        """
+        names=set(self.classes)
+        for sequences in self.rules.values():
+            names.update(name for sequence in sequences for name in sequence)
+        for sources in self.tables.values():
+            names.update(name for name in sources if name not in self.rules)
+        classes={}
+        for name in sorted(names):
+            if name in self.classes:
+                classes[name]=self.classes[name]
+            elif isinstance(getattr(base,name,None),tuple):
+                classes[name]=getattr(base,name)
+            else:
+                raise ValueError("profile %s uses the unknown affix class %s" % (self.name,name))
+        return classes
+
+
+    def content_hash(self,base=Samad):
+        """
+        hash of the resolved classes, rules and tables
+        """
+        content={"version":VERSION,"classes":self.resolve(base),"rules":self.rules,"tables":self.tables}
+        return hashlib.sha1(json.dumps(content,sort_keys=True,ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+    def combine(self,base=Samad):
+        """
+        affixes of every table of Samad.table_names, empty if the profile does not define it
+        """
+        classes=self.resolve(base)
+        rules={name:[''.join(affixes) for sequence in sequences
+                     for affixes in product(*(classes[part] for part in sequence))]
+               for name,sequences in self.rules.items()}
+        return {table:[affix for source in self.tables.get(table,())
+                       for affix in (rules[source] if source in rules else classes[source])]
+                for table in Samad.table_names}
+
+
+    def compile(self,samad,cache_dir=None):
+        """
+        length-indexed tables of the profile, as Samad.compile_tables() returns
+        them, read from the disk cache when they were compiled before
+        """
+        cache_dir=cache_dir or CACHE_DIR
+        path=os.path.join(cache_dir,"profile-%s.pickle" % self.content_hash(type(samad)))
+        try:
+            with open(path,"rb") as f:
+                return pickle.load(f)
+        except (OSError,EOFError,pickle.UnpicklingError):
+            pass
+
+        tables={name:samad.index(affixes) for name,affixes in self.combine(type(samad)).items()}
+        try:
+            os.makedirs(cache_dir,exist_ok=True)
+            # written aside and renamed, so that readers never see half a file
+            fd,temporary=tempfile.mkstemp(dir=cache_dir)
+            with os.fdopen(fd,"wb") as f:
+                pickle.dump(tables,f,pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary,path)
+        except OSError:
+            pass
+        return tables
+
+
+def profile_stemmer(profile,engine="index"):
+    """
+    Samad class (of the engine) that stems with the tables of the profile;
+    its classes also replace the attributes of Samad (e.g. di_neg_pre2)
+    """
+    profile=AffixProfile.get(profile)
+    base=Samad.engines[engine]
+    attributes=dict(profile.classes)
+    attributes["profile"]=profile
+    return type("%s_%s" % (base.__name__,profile.name),(base,),attributes)
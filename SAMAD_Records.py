@@ -0,0 +1,250 @@
+
+# Streaming stemming of the text fields of JSON lines and CSV records
+#
+#   python SAMAD_Records.py --field text [--field ...] [--format jsonl|csv] [--tokens]
+#                           [--mode stem|stem_di] [--jobs N] [-o OUTPUT] [FILE ...]
+#
+# Each record is written back with one added field per selected field,
+# named after it with the suffix "_stem": the text with its Arabic words
+# replaced by their stems, or with --tokens the list of the stems (joined
+# by spaces in CSV). The input is read in blocks of about --block-size
+# bytes; the Arabic words of a whole block are stemmed with one
+# deduplicated batch. Blocks are stemmed on --jobs worker processes, at most
+# two per worker at a time, and written in input order. A malformed JSON
+# line or a CSV header that differs from the first one stops the output
+# with an error giving the file and the line.
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+
+from SAMAD_CLI import input_blocks
+from SAMAD_Parallel import pool_map
+from SAMAD_Stemmer import MODES, Samad
+
+
+FORMATS=("jsonl","csv")
+
+
+def stem_jsonl(samad,mode,block,fields,suffix,tokens=False,where=("<block>",1)):
+    """
+    stem the fields of a block of JSON lines and return the lines with the added fields;
+    where is the name of the input and the number of the first line of the block,
+    given by the ValueError raised on a malformed line
+    """
+    # JSON lines end with "\n" only: str.splitlines() would also split the
+    # strings that hold U+2028, U+0085, form feeds and other line breaks
+    lines=list(io.StringIO(block,newline="\n"))
+    records=[]
+    for index,line in enumerate(lines):
+        try:
+            records.append(json.loads(line) if line.strip() else None)
+        except json.JSONDecodeError as error:
+            raise ValueError("%s:%d: invalid JSON line: %s at column %d"
+                             % (where[0],where[1]+index,error.msg,error.pos+1)) from None
+    columns=[samad.stem_text_many([record.get(field) if isinstance(record,dict)
+                                   and isinstance(record.get(field),str) else None
+                                   for record in records],mode,tokens)
+             for field in fields]
+
+    output=[]
+    for index,(line,record) in enumerate(zip(lines,records)):
+        if not isinstance(record,dict):
+            output.append(line)
+            continue
+        added={field+suffix:column[index] for field,column in zip(fields,columns)}
+        text=line.rstrip()
+        if text.endswith("}") and not any(key in record for key in added):
+            # splice the added fields into the line instead of serializing the record again
+            fields_text=json.dumps(added,ensure_ascii=False)[1:-1]
+            text=text[:-1]+(", " if record else "")+fields_text+"}"
+        else:
+            record.update(added)
+            text=json.dumps(record,ensure_ascii=False)
+        output.append(text+"\n")
+    return "".join(output)
+
+
+def stem_csv_rows(samad,mode,rows,columns,tokens=False):
+    """
+    stem the columns (indexes) of a list of CSV rows and return
+    the rows as CSV text, with one added column per stemmed column
+    """
+    stemmed=[samad.stem_text_many([row[column] if column<len(row) else None for row in rows],mode,tokens)
+             for column in columns]
+    output=io.StringIO()
+    writer=csv.writer(output,lineterminator="\n")
+    for index,row in enumerate(rows):
+        added=[values[index] for values in stemmed]
+        if tokens:
+            added=[" ".join(value) if value is not None else "" for value in added]
+        else:
+            added=["" if value is None else value for value in added]
+        writer.writerow(row+added)
+    return output.getvalue()
+
+
+def _stem_jsonl_block(samad,mode,task):
+    return stem_jsonl(samad,mode,*task)
+
+
+def _stem_csv_block(samad,mode,task):
+    return stem_csv_rows(samad,mode,*task)
+
+
+def _map_blocks(function,mode,tasks,workers,cache_size):
+    """
+    yield function(samad,mode,task) of every task in input order, in this 
+    process if workers==1, on a pool of worker processes otherwise
+    """
+    if workers==1:
+        samad=Samad(cache_size)
+        return (function(samad,mode,task) for task in tasks)
+    return pool_map(function,mode,tasks,workers,cache_size)
+
+
+def stem_jsonl_stream(paths,fields,mode="stem",suffix="_stem",tokens=False,
+                      workers=1,block_size=1<<20,cache_size=65536):
+    """
+    yield the stemmed JSON lines of the files (the standard input for "-"),
+    one string per block of about block_size bytes
+    """
+    def tasks():
+        for path in paths or ["-"]:
+            line=1
+            for block in input_blocks([path],block_size):
+                yield block.decode("utf-8"),fields,suffix,tokens,(input_name(path),line)
+                line+=block.count(b"\n")
+    yield from _map_blocks(_stem_jsonl_block,mode,tasks(),workers,cache_size)
+
+
+def input_name(path):
+    return "<stdin>" if path=="-" else path
+
+
+def csv_row_blocks(reader,block_size):
+    """
+    lists of rows of a csv reader holding about block_size characters
+    """
+    rows=[]
+    size=0
+    for row in reader:
+        rows.append(row)
+        size+=sum(map(len,row))
+        if size>=block_size:
+            yield rows
+            rows=[]
+            size=0
+    if rows:
+        yield rows
+
+
+def stem_csv_stream(paths,fields,mode="stem",suffix="_stem",tokens=False,
+                    workers=1,block_size=1<<20,cache_size=65536):
+    """
+    yield the stemmed CSV of the files (the standard input for "-"), which
+    share the header of the first one (ValueError otherwise), as one string
+    per block of about block_size characters, the header first
+    """
+    header=None
+    header_path=None
+    def tasks():
+        nonlocal header
+        for path in paths or ["-"]:
+            if path=="-":
+                f=io.TextIOWrapper(sys.stdin.buffer,encoding="utf-8",newline="")
+            else:
+                f=open(path,encoding="utf-8",newline="")
+            try:
+                reader=csv.reader(f)
+                first=next(reader,None)
+                if first is None:
+                    continue
+                if header is None:
+                    header=first
+                    header_path=path
+                    missing=[field for field in fields if field not in header]
+                    if missing:
+                        raise ValueError("no field %s in the CSV header" % ", ".join(missing))
+                    columns=[header.index(field) for field in fields]
+                    output=io.StringIO()
+                    csv.writer(output,lineterminator="\n").writerow(header+[field+suffix for field in fields])
+                    yield None,output.getvalue()
+                elif first!=header:
+                    raise ValueError("%s:1: the CSV header differs from the header of %s"
+                                     % (input_name(path),input_name(header_path)))
+                for rows in csv_row_blocks(reader,block_size):
+                    yield (rows,columns,tokens),None
+            finally:
+                # closing the wrapper of the standard input would close sys.stdin.buffer
+                if path=="-":
+                    f.detach()
+                else:
+                    f.close()
+
+    # the header is written by the main process, the rows by the workers
+    generated=tasks()
+    for task,text in generated:
+        if text is not None:
+            yield text
+            break
+    yield from _map_blocks(_stem_csv_block,mode,(task for task,_ in generated),workers,cache_size)
+
+
+def parse_args(argv=None):
+    parser=argparse.ArgumentParser(
+        description="Stem text fields of JSON lines or CSV records with the SAMAD stemmer")
+    parser.add_argument("files",nargs="*",metavar="FILE",
+                        help="input files, the standard input if none or -")
+    parser.add_argument("--field",action="append",required=True,dest="fields",
+                        help="field to stem, may be repeated")
+    parser.add_argument("-f","--format",choices=FORMATS,default="jsonl",
+                        help="format of the records (default: jsonl)")
+    parser.add_argument("--suffix",default="_stem",
+                        help="suffix of the names of the added fields (default: _stem)")
+    parser.add_argument("--tokens",action="store_true",
+                        help="add the list of the stems instead of the stemmed text")
+    parser.add_argument("-m","--mode",choices=MODES,default="stem",
+                        help="stem: standard Arabic, stem_di: Moroccan Arabic (default: stem)")
+    parser.add_argument("-o","--output",
+                        help="output file (default: the standard output)")
+    parser.add_argument("-j","--jobs",type=int,default=1,
+                        help="number of worker processes, 0 for one per CPU (default: 1)")
+    parser.add_argument("--block-size",type=int,default=1<<20,
+                        help="approximate size of the blocks stemmed at once (default: 1048576)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args=parse_args(argv)
+    if args.block_size<1:
+        sys.exit("SAMAD_Records.py: error: --block-size must be positive")
+    if args.jobs<0:
+        sys.exit("SAMAD_Records.py: error: --jobs must be >= 0")
+    stream=stem_jsonl_stream if args.format=="jsonl" else stem_csv_stream
+    blocks=stream(args.files,args.fields,args.mode,args.suffix,args.tokens,
+                  args.jobs or os.cpu_count() or 1,args.block_size)
+
+    output=open(args.output,"wb") if args.output else sys.stdout.buffer
+    try:
+        for text in blocks:
+            output.write(text.encode("utf-8"))
+        output.flush()
+    except BrokenPipeError:
+        # the reader went away (e.g. piped into head): silence the
+        # flush of the standard output at exit
+        os.dup2(os.open(os.devnull,os.O_WRONLY),sys.stdout.fileno())
+        return 1
+    except ValueError as error:
+        sys.exit("SAMAD_Records.py: error: %s" % error)
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+
+# Local stemming service of the SAMAD stemmer
+#
+#   python SAMAD_Server.py (--unix PATH | --port PORT) [--workers N] [--cache-size N]
+#
+# The server keeps one warm stemmer per host. Concurrent requests are
+# gathered into micro-batches, looked up in a shared cache and the missing
+# words are stemmed in one deduplicated batch, in a thread or on a pool of
+# worker processes.
+#
+# Unix socket protocol: one JSON object per line in each direction,
+#   {"id": 1, "mode": "stem_di", "words": ["..."]} -> {"id": 1, "stems": ["..."]}
+# HTTP protocol: POST /stem or /stem_di with {"words": ["..."]} -> {"stems": ["..."]}
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from SAMAD_Parallel import init_worker, run_task
+from SAMAD_Stemmer import MODES, Samad, StemCache, check_mode
+
+
+def _stem_words(samad,mode,words):
+    return getattr(samad,mode+"_many")(words)
+
+
+class StemServer:
+    """
+    Micro-batching stemming service: requests that arrive within batch_delay
+    seconds of each other (or until batch_size words are pending) are served
+    by one batch. workers=0 stems in a thread of the server process,
+    workers>0 on that many worker processes.
+    """
+
+    def __init__(self,workers=0,cache_size=1<<20,batch_size=4096,batch_delay=0.001):
+        self.workers=workers
+        self.batch_size=batch_size
+        self.batch_delay=batch_delay
+        self.caches={mode:StemCache(cache_size) if cache_size else None for mode in MODES}
+        self.pending={mode:[] for mode in MODES}
+        self.pending_words=dict.fromkeys(MODES,0)
+        self.timers=dict.fromkeys(MODES)
+        self.batches=set()
+        if workers:
+            Samad()   # compile the tables once, before forking
+            self.executor=ProcessPoolExecutor(workers,initializer=init_worker,initargs=(0,))
+        else:
+            self.samad=Samad(cache_size=0)
+            self.executor=ThreadPoolExecutor(1)
+
+
+    async def stem(self,mode,words):
+        """
+        stems of the words, from the next batch of the mode
+        """
+        check_mode(mode)
+        if not isinstance(words,list) or not all(isinstance(word,str) for word in words):
+            raise ValueError("words must be a list of strings")
+        future=asyncio.get_running_loop().create_future()
+        self.pending[mode].append((words,future))
+        self.pending_words[mode]+=len(words)
+        if self.pending_words[mode]>=self.batch_size:
+            self.flush(mode)
+        elif self.timers[mode] is None:
+            self.timers[mode]=asyncio.get_running_loop().call_later(self.batch_delay,self.flush,mode)
+        return await future
+
+
+    def flush(self,mode):
+        if self.timers[mode] is not None:
+            self.timers[mode].cancel()
+            self.timers[mode]=None
+        batch=self.pending[mode]
+        self.pending[mode]=[]
+        self.pending_words[mode]=0
+        if batch:
+            task=asyncio.ensure_future(self.run_batch(mode,batch))
+            self.batches.add(task)
+            task.add_done_callback(self.batches.discard)
+
+
+    async def run_batch(self,mode,batch):
+        try:
+            stems=dict.fromkeys(word for words,_ in batch for word in words)
+            cache=self.caches[mode]
+            if cache is not None:
+                for word in stems:
+                    stems[word]=cache.get(word)
+            missing=[word for word,stem in stems.items() if stem is None]
+            if missing:
+                for word,stem in zip(missing,await self.stem_missing(mode,missing)):
+                    stems[word]=stem
+                    if cache is not None:
+                        cache.put(word,stem)
+        except Exception as error:
+            for _,future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for words,future in batch:
+            if not future.done():
+                future.set_result([stems[word] for word in words])
+
+
+    async def stem_missing(self,mode,words):
+        loop=asyncio.get_running_loop()
+        if not self.workers:
+            return await loop.run_in_executor(self.executor,getattr(self.samad,mode+"_many"),words)
+        size=-(-len(words)//self.workers)
+        chunks=await asyncio.gather(*(loop.run_in_executor(self.executor,run_task,_stem_words,
+                                                           mode,words[i:i+size])
+                                      for i in range(0,len(words),size)))
+        return [stem for chunk in chunks for stem in chunk]
+
+
+    async def handle_lines(self,reader,writer):
+        """
+        serve the JSON lines protocol of one Unix socket connection
+        """
+        try:
+            while True:
+                line=await reader.readline()
+                if not line:
+                    break
+                request_id=None
+                try:
+                    request=json.loads(line)
+                    request_id=request.get("id")
+                    stems=await self.stem(request.get("mode","stem"),request.get("words"))
+                    response={"id":request_id,"stems":stems}
+                except (ValueError,AttributeError) as error:
+                    response={"id":request_id,"error":str(error)}
+                except Exception as error:
+                    # a failed batch (e.g. a broken worker pool) is answered too
+                    response={"id":request_id,"error":"%s: %s" % (type(error).__name__,error)}
+                writer.write(json.dumps(response,ensure_ascii=False).encode("utf-8")+b"\n")
+                await writer.drain()
+        except (ConnectionError,asyncio.CancelledError):
+            # the client went away, or the server is shutting down: 
+            # the task ends quietly instead of logging a traceback
+            pass
+        finally:
+            writer.close()
+
+
+    async def handle_http(self,reader,writer):
+        """
+        serve the HTTP/1.1 requests of one connection, kept alive between requests
+        """
+        try:
+            while True:
+                request_line=await reader.readline()
+                if not request_line.strip():
+                    break
+                headers={}
+                while True:
+                    line=await reader.readline()
+                    if not line.strip():
+                        break
+                    name,_,value=line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()]=value.strip()
+                body=await reader.readexactly(int(headers.get("content-length",0)))
+
+                method,path,*_=request_line.decode("latin-1").split()
+                status,response=await self.http_response(method,path,body)
+                data=json.dumps(response,ensure_ascii=False).encode("utf-8")
+                writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json; charset=utf-8\r\n"
+                             b"Content-Length: %d\r\n\r\n" % (status,http.client.responses[status].encode(),len(data))+data)
+                await writer.drain()
+                if headers.get("connection","").lower()=="close":
+                    break
+        except (ConnectionError,asyncio.IncompleteReadError,ValueError,asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+    async def http_response(self,method,path,body):
+        mode=path.strip("/")
+        if mode not in MODES:
+            return 404,{"error":"unknown path %s" % path}
+        if method!="POST":
+            return 405,{"error":"use POST"}
+        try:
+            return 200,{"stems":await self.stem(mode,json.loads(body).get("words"))}
+        except (ValueError,AttributeError) as error:
+            return 400,{"error":str(error)}
+        except Exception as error:
+            return 500,{"error":"%s: %s" % (type(error).__name__,error)}
+
+
+    async def serve_unix(self,path):
+        server=await asyncio.start_unix_server(self.handle_lines,path)
+        async with server:
+            await server.serve_forever()
+
+
+    async def serve_http(self,host="127.0.0.1",port=8765):
+        server=await asyncio.start_server(self.handle_http,host,port)
+        async with server:
+            await server.serve_forever()
+
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class StemClient:
+    """
+    Client of a StemServer, over its Unix socket (path) or over HTTP (host, port).
+    The connection is opened on the first request and reused by the next ones.
+    """
+
+    def __init__(self,path=None,host="127.0.0.1",port=8765,timeout=None):
+        self.path=path
+        self.host=host
+        self.port=port
+        self.timeout=timeout
+        self.connection=None
+        self.request_id=0
+
+
+    def stem(self,words):
+        return self.request("stem",words)
+
+
+    def stem_di(self,words):
+        return self.request("stem_di",words)
+
+
+    def request(self,mode,words):
+        words=list(words)
+        if self.path:
+            response=self.request_unix(mode,words)
+        else:
+            response=self.request_http(mode,words)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["stems"]
+
+
+    def request_unix(self,mode,words):
+        if self.connection is None:
+            sock=socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            self.connection=(sock,sock.makefile("rb"))
+        sock,responses=self.connection
+        self.request_id+=1
+        request={"id":self.request_id,"mode":mode,"words":words}
+        sock.sendall(json.dumps(request,ensure_ascii=False).encode("utf-8")+b"\n")
+        line=responses.readline()
+        if not line:
+            self.close()
+            raise ConnectionError("the stemming server closed the connection")
+        return json.loads(line)
+
+
+    def request_http(self,mode,words):
+        if self.connection is None:
+            self.connection=http.client.HTTPConnection(self.host,self.port,timeout=self.timeout)
+        body=json.dumps({"words":words},ensure_ascii=False).encode("utf-8")
+        try:
+            self.connection.request("POST","/"+mode,body,{"Content-Type":"application/json"})
+            response=self.connection.getresponse()
+            return json.loads(response.read())
+        except (ConnectionError,http.client.HTTPException):
+            self.close()
+            raise
+
+
+    def close(self):
+        if self.connection is not None:
+            if self.path:
+                sock,responses=self.connection
+                responses.close()
+                sock.close()
+            else:
+                self.connection.close()
+            self.connection=None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self,*exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Serve the SAMAD stemmer on a Unix socket or on localhost HTTP")
+    address=parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--unix",metavar="PATH",help="path of the Unix socket")
+    address.add_argument("--port",type=int,help="HTTP port")
+    parser.add_argument("--host",default="127.0.0.1",help="HTTP host (default: 127.0.0.1)")
+    parser.add_argument("--workers",type=int,default=0,
+                        help="number of worker processes, 0 to stem in the server process (default: 0)")
+    parser.add_argument("--cache-size",type=int,default=1<<20,help="shared cache size per mode (default: 1048576)")
+    parser.add_argument("--batch-size",type=int,default=4096,help="words that trigger a batch (default: 4096)")
+    parser.add_argument("--batch-delay",type=float,default=0.001,
+                        help="seconds a request waits for others to join its batch (default: 0.001)")
+    args=parser.parse_args(argv)
+
+    server=StemServer(args.workers,args.cache_size,args.batch_size,args.batch_delay)
+    if args.unix and os.path.exists(args.unix):
+        os.unlink(args.unix)
+    try:
+        asyncio.run(serve_until_signal(server.serve_unix(args.unix) if args.unix 
+                                       else server.serve_http(args.host,args.port)))
+    finally:
+        server.close()
+        if args.unix and os.path.exists(args.unix):
+            os.unlink(args.unix)
+    return 0
+
+
+async def serve_until_signal(serving):
+    """
+    run the server until SIGINT or SIGTERM, so that the workers are shut down
+    """
+    serving=asyncio.ensure_future(serving)
+    loop=asyncio.get_running_loop()
+    for signum in (signal.SIGINT,signal.SIGTERM):
+        loop.add_signal_handler(signum,serving.cancel)
+    try:
+        await serving
+    except asyncio.CancelledError:
+        pass
+
+
+if __name__=="__main__":
+    sys.exit(main())
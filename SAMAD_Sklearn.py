@@ -0,0 +1,107 @@
+
+# scikit-learn transformer of the SAMAD stemmer
+#
+#   pipeline=make_pipeline(StemTransformer("stem_di"),TfidfVectorizer())
+#   CountVectorizer(analyzer=StemTransformer("stem_di").fit(texts))
+#
+# fit() stems the distinct words of the training texts once into a
+# vocabulary; transform() looks the words up in it and only applies the
+# rules to the words it has not seen. The transformer pickles without its
+# stemmer, which each process builds again on first use, so it can be sent
+# to n_jobs workers. scikit-learn is optional: without it the class keeps
+# the same methods, and an unfitted transformer stems with the rules alone
+# instead of raising NotFittedError.
+
+try:
+    from sklearn.base import BaseEstimator, TransformerMixin
+    from sklearn.utils.validation import check_is_fitted
+except ImportError:
+    check_is_fitted=None
+
+    class BaseEstimator:
+        pass
+
+    class TransformerMixin:
+        def fit_transform(self,X,y=None):
+            return self.fit(X,y).transform(X)
+
+from SAMAD_Stemmer import Samad, check_mode
+
+
+class StemTransformer(TransformerMixin,BaseEstimator):
+    """
+    Stem texts with the mode ("stem" or "stem_di") of the stemmer.
+    transform() returns the texts with their Arabic words replaced by their
+    stems, or with tokens=True the lists of the stems of their Arabic words.
+    cache_size is the size of the stem cache of the words missing from the
+    vocabulary.
+    """
+
+    def __init__(self,mode="stem_di",tokens=False,cache_size=8192):
+        self.mode=mode
+        self.tokens=tokens
+        self.cache_size=cache_size
+
+
+    @property
+    def samad(self):
+        samad=self.__dict__.get("_samad")
+        if samad is None:
+            check_mode(self.mode)
+            samad=self._samad=Samad(self.cache_size)
+        return samad
+
+
+    def __getstate__(self):
+        state=self.__dict__.copy()
+        state.pop("_samad",None)
+        return state
+
+
+    def fit(self,X,y=None):
+        """
+        stem the distinct Arabic words of the texts X into vocabulary_
+        """
+        samad=self.samad
+        words=dict.fromkeys(word for text in X for word in samad.tokenize(text))
+        self.vocabulary_=dict(zip(words,getattr(samad,self.mode+"_many")(words)))
+        return self
+
+
+    def stem_function(self):
+        """
+        function that stems a word with the vocabulary, and with the rules for
+        the words it misses; NotFittedError before fit() if scikit-learn is
+        installed, the rules alone otherwise
+        """
+        if check_is_fitted is not None:
+            check_is_fitted(self,"vocabulary_")
+        vocabulary=self.__dict__.get("vocabulary_",{})
+        rules=getattr(self.samad,self.mode)
+        def stem_word(word):
+            stem=vocabulary.get(word)
+            return rules(word) if stem is None else stem
+        return stem_word
+
+
+    def transform(self,X):
+        """
+        stem the texts X with the vocabulary, and the rules for the words it misses
+        """
+        stem_word=self.stem_function()
+        samad=self.samad
+        if self.tokens:
+            return [list(map(stem_word,samad.tokenize(text))) for text in X]
+        stemmed=[]
+        for text in X:
+            parts=samad.split_words(text)
+            parts[1::2]=map(stem_word,parts[1::2])
+            stemmed.append("".join(parts))
+        return stemmed
+
+
+    def __call__(self,text):
+        """
+        stems of the Arabic words of the text, to serve as the analyzer of a vectorizer
+        """
+        return list(map(self.stem_function(),self.samad.tokenize(text)))
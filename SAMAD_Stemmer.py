@@ -1,630 +1,1575 @@
-
-# Algorithm: Mohcine Maghfour, Abdeljalil Elouardighi (2022)
-# Author: Mohcine Maghfour <maghfour.mohcin@gmail.com>
-
-
-class Samad:
-    """
-SAMAD stemmer - Standard Arabic and Moroccan Arabic Dialect Stemmer - : 
-is a light Arabic stemmer that removes the common prefixes and 
-suffixes from Arabic words. Besides the stemming of standard Arabic, 
-SAMAD stemmer offers the possibility of stemming words that
-belong to the Moroccan dialectal Arabic.
-
-Samad.stem(word) returns the stem of the input word according to the standard Arabic option.
-Samad.stem_di(word) returns the stem of the input word according to the Moroccan Arabic option.
-
-    """
-    
-    def __init__(self):
-
-        # noun prefixes in standard Arabic
-        
-        self.noun_pre1= ["\u0627\u0644"]    #["ال"]
-        self.noun_pre2= ["\u0644\u0644"]    #["لل"]
-        self.noun_pre3= ["\u0628","\u0643"] #["ك","ب"]
-        self.noun_pre4= ["\u0641","\u0648"] #["و","ف"]    
-        self.noun_pre5= ["\u0644"]          #["ل"]
-
-        # noun suffixes in standard Arabic
-                   
-        self.noun_suf1=["\u0648\u064A\u062A","\u0648\u064A\u0627\u062A",
-                        "\u064A\u0627","\u064A\u062A","\u064A","\u0648",
-                        "\u0627","\u0647\u0627\u062A","\u064A\u0627\u062A",
-                        "\u0627\u062A","\u062A"]
-                        #["ت","ات","يات","هات","ا","و","ي","يت","يا","ويات","ويت"]
-                        
-        self.noun_suf2=["\u0647","\u0647\u0627","\u0647\u0645\u0627",
-                       "\u0647\u0645","\u0647\u0646","\u0643",
-                        "\u0643\u064A","\u0643\u0645\u0627",
-                       "\u0643\u0645","\u064A","\u0646\u0627"]
-                      #["ه","ها","هما","هم","هن","ك","كي","كما","كم", "ي","نا"]
-                      
-        self.noun_suf3=["\u064A\u0629","\u0648\u0646","\u064A\u0646",
-                       "\u064A\u0648\u0646","\u064A\u064A\u0646",
-                       "\u062A\u064A\u0646","\u0627\u0646","\u0629",
-                       "\u064A\u0627","\u0648\u064A\u0629"]
-                       #["ية","ون","ين","يون","يين","تين","ان","ة","يا","وية"]
-    
-        # verb prefixes in standard Arabic  
-                                         
-        self.verb_pre1=["\u062A","\u064A","\u0646","\u0627"] 
-                                         #["ت","ي","ن","ا"]
-        
-        self.verb_pre2=["\u0633","\u0644"]   #["س","ل"]
-        self.verb_pre3=["\u0648","\u0641"]   #["و","ف"]
-        
-        # verb suffixes in standard arabic
-        
-                                                
-        self.verb_suf1=["\u0648\u0646","\u0646","\u0627\u0646",
-                       "\u064A\u0646","\u062A","\u0627","\u0648"] 
-                                #["ون","ن","ان","ين","ت","ا","و"] 
-        
-                                                         
-        self.verb_suf2=["\u064A","\u062A\u0645\u0648","\u062A\u0645\u0627"]
-                                                          #["ي","تمو","تما"]
-        
-        self.verb_suf3=["\u0646\u0627"]   #["نا"]  
-        self.verb_suf4=["\u0646\u064A"]   #["ني"]
-       
-                                         
-        self.verb_suf5=["\u0647","\u0647\u0627","\u0647\u0645\u0627",
-                        "\u0647\u0645","\u0647\u0646"] 
-                                         #["ه","ها","هما","هم","هن"] 
-        
-                                               
-        self.verb_suf6=["\u0643","\u0643\u064A","\u0643\u0645\u0627",
-                        "\u0643\u0645"]
-                                               #["ك","كي","كما","كم"]            
-        
-                                                                           
-        self.verb_suf7=["\u0648\u0627","\u062A\u0645","\u064A\u0627"]
-                                                      #["وا","تم","يا"]
-
-  ## Dialectal Affixes  
-
-        # noun prefixes in Morrocan Arabic
-    
-        self.di_noun_pre1=["\u0627\u0644"]  #["ال"]
-        
-                                                 
-        self.di_noun_pre2=["\u064A","\u062A","\u062F","\u0639","\u063A"]
-                                                 #["ي","ت","د","ع","غ"]  
-        
-                                                    
-        self.di_noun_pre3=["\u0627\u0648","\u0648\u0627","\u0648"]
-                                                    #["او","وا","و"]
-              
-        # noun suffixes in Morrocan Arabic
-        
-        self.di_noun_suf1=["\u0627\u062A","\u062A"] #["ات","ت"]
-        self.di_noun_suf2=["\u0627"]                #["ا"]
-        self.di_noun_suf3=["\u064A\u0646"]          #["ين"]
-        
-                                     
-        self.di_noun_suf4=["\u0647\u0645","\u0647\u0648\u0645",
-                          "\u0647\u0627","\u0643\u0645","\u0643\u0648\u0645",
-                          "\u0643\u064A","\u0643"]
-                                     #["هم","هوم","ها","كم","كوم","كي","ك"]
-        
-        self.di_noun_suf5=["\u0648","\u064A"] #["و","ي"] 
-        
-                                                   
-        self.di_noun_suf6=["\u0647","\u0646\u064A","\u0646\u0627"] 
-                                                   #["ه","ني","نا"]
-        
-        # verb prefixes in Moroccan Arabic
-        
-                                   
-        self.di_verb_pre1=["\u0643\u0627","\u0639\u0627","\u063A\u0627",
-                           "\u062A\u0627","\u0643","\u0639","\u063A",
-                          "\u062A"]
-                          #["كا","عا","غا","تا","ك","ع","غ","ت"]
-                                      
-        self.di_verb_pre2=["\u0646","\u062A","\u064A"]
-                                      #["ن","ت","ي"] 
-        
-                                                        
-        self.di_verb_pre3=["\u0627\u0648","\u0648\u0627","\u0648"]
-                                                    #["او","وا","و"]
-        
-        
-        self.di_verb_suf1=["\u0648"]  #["و"]
-        
-                                                   
-        self.di_verb_suf2=["\u064A","\u062A\u064A","\u062A\u0648"]
-                                                   #["ي","تي","تو"]
-        
-                                        
-        self.di_verb_suf3=["\u062A","\u0627\u062A"]  #["ات","ت"]
-        
-        self.di_verb_suf4=["\u0646\u064A"]  #["ني"]
-        
-        self.di_verb_suf5=["\u0646\u0627"]  #["نا"]
-        
-        self.di_verb_suf6=["\u0644","\u0644\u064A"] #["لي","ل"]
-        
-        self.di_verb_suf7=["\u0643","\u0643\u0645","\u0643\u0648\u0645"]
-                                                       #["كم","ك","كوم"]
-        
-                                               
-        self.di_verb_suf8=["\u0647","\u0647\u0627","\u0647\u0645",
-                           "\u0647\u0648\u0645"] 
-                                           #["ه","ها","هوم","هم"]
-        
-        self.di_verb_suf9=["\u064A","\u064A\u0627"] #["يا","ي"] 
-      
-       #  negation prefixes in Moroccan Arabic
-                                                   
-        self.di_neg_pre1=["\u0627\u0648","\u0648\u0627","\u0648"]
-                                                   #["او","وا","و"]
-        
-        self.di_neg_pre2=["\u0645","\u0645\u0627"] #["م","ما"]
-        
-                                  
-        self.di_neg_pre3=["\u0643\u0627","\u0639\u0627","\u063A\u0627",
-                           "\u062A\u0627","\u0643","\u0639","\u063A",
-                          "\u062A"] 
-                                 #["كا","عا","غا","تا","ك","ع","غ","ت"] 
-        
-        self.di_neg_pre4=["\u0646","\u062A","\u064A"] #["ن","ت","ي"]
-        
-        # negation suffixes in Moroccan Arabic
-        self.di_neg_suf1=["\u0634","\u0634\u064A"] #["شي","ش"]
-        
-        # post normalisation suffixes 
-                                          
-        self.post_suf1=["\u0627","\u0648","\u064A","\u064A"]
-                                          #["ا","و","ي","ت"]
-          
-        
-        # Combined affixes
-        
-        self.noun_prefs= self.arrange(self.noun_pref_gen())
-        self.noun_suffs= self.arrange(self.noun_suff_gen())
-        
-        self.verb_prefs= self.arrange(self.verb_pref_gen()) 
-        self.verb_suffs= self.arrange(self.verb_suff_gen()) 
-        
-        self.di_noun_prefs=self.arrange(set(self.di_noun_pref_gen()+self.noun_pref_gen()))
-        self.di_noun_suffs=self.arrange(set(self.di_noun_suff_gen()+self.noun_suff_gen()))
-        
-        self.di_verb_prefs= self.arrange(self.di_verb_pref_gen()) 
-        self.di_verb_suffs= self.arrange(set(self.di_verb_suff_gen()+self.verb_suff_gen())) 
-        
-        self.neg_prefs= self.arrange(self.neg_pref_gen())
-        
-        self.noun_joined_suffs=self.arrange(self.noun_suf2+self.noun_suf3)
-        self.noun_joined_prefs=self.arrange(self.noun_joined_pref_gen())
-        
-        self.full_suffs=self.arrange(set(self.noun_suff_gen()+self.di_noun_suff_gen()+self.verb_suff_gen()+self.di_verb_suff_gen() ))
-        self.full_prefs=self.arrange(set(self.noun_pref_gen()+self.di_noun_pref_gen() +self.verb_pref_gen()+self.di_verb_pref_gen()))
-        
-        self.standard_suffs=self.arrange(set(self.noun_suff_gen()+self.verb_suff_gen() ))
-        self.standard_prefs=self.arrange(set(self.noun_pref_gen()+self.verb_pref_gen() ))
-        
-
-    # combining affixes in standard Arabic 
-        
-    def noun_pref_gen(self):
-        """ 
-        Generate diffrent combinations of noun prefixes in standard Arabic
-        """
-        noun_pr=[]
-        for p1 in self.noun_pre1:
-            noun_pr.append(p1)
-            for p3 in self.noun_pre3:
-                noun_pr.append(p3+p1)
-            for p4 in self.noun_pre4:
-                noun_pr.append(p4+p1)
-                for p3 in self.noun_pre3:
-                    noun_pr.append(p4+p3+p1)
-                    
-        for p2 in self.noun_pre2:
-            noun_pr.append(p2)
-            for p4 in self.noun_pre4:
-                noun_pr.append(p4+p2)
-        return noun_pr
-    
-    
-    def noun_suff_gen(self):
-        """ 
-        Generate diffrent combinations of noun suffixes in standard Arabic
-        """
-        noun_su=[]
-        for s1 in self.noun_suf1:
-            for s2 in self.noun_suf2:    
-                noun_su.append(s1+s2)
-        noun_su+=self.noun_suf1+self.noun_suf2+ self.noun_suf3       
-        return noun_su
-     
-    def noun_joined_pref_gen(self):
-        joined_pr=[]
-        for p4 in self.noun_pre4:
-            for p5 in self.noun_pre5:
-                joined_pr.append(p4+p5)
-        joined_pr+=self.noun_pre3+self.noun_pre4+self.noun_pre5
-        return joined_pr
-    
-    
-    def verb_pref_gen(self):
-        """ 
-        Generate diffrent combinations of verb prefixes in standard Arabic
-        """
-        verb_pr=[]
-        for p1 in self.verb_pre1:
-            verb_pr.append(p1)
-            for p2 in self.verb_pre2:
-                verb_pr.append(p2+p1)
-                for p3 in self.verb_pre3:
-                    verb_pr.append(p3+p2+p1)
-            for p3 in self.verb_pre3:
-                verb_pr.append(p3+p1)    
-        return verb_pr        
-
-
-    def verb_suff_gen(self):
-        """ 
-        Generate diffrent combinations of verb suffixes in standard Arabic
-        """
-        verb_su=[]
-        for s1 in self.verb_suf1:
-            for s3 in self.verb_suf3:
-                verb_su.append(s1+s3)
-            for s4 in self.verb_suf4:
-                verb_su.append(s1+s4)
-            for s5 in self.verb_suf5:
-                verb_su.append(s1+s5)
-            for s6 in self.verb_suf6:
-                verb_su.append(s1+s6)
-        
-        for s2 in self.verb_suf2:
-            for s3 in self.verb_suf3:
-                verb_su.append(s2+s3)
-            for s4 in self.verb_suf4:    
-                verb_su.append(s2+s4)
-            for s5 in self.verb_suf5:
-                verb_su.append(s2+s5)
-            
-        for s5 in self.verb_suf5:
-            for s3 in self.verb_suf3:
-                verb_su.append(s3+s5)
-           
-        for s6 in self.verb_suf6:
-            for s3 in self.verb_suf3:
-                verb_su.append(s3+s6)    
-                
-                
-        verb_su+=self.verb_suf1+self.verb_suf2+self.verb_suf5+self.verb_suf6+self.verb_suf7+self.verb_suf3+self.verb_suf4
-        return verb_su
-        
-
-        
-    # combining affixes in Moroccan Arabic
-    
-    def di_noun_pref_gen(self):
-        """ 
-        Generate diffrent combinations of noun prefixes in Morrocan Arabic
-        """
-        di_noun_pr=[]
-        for p1 in self.di_noun_pre1:
-            for p2 in self.di_noun_pre2:
-                di_noun_pr.append(p2+p1)
-                for p3 in self.di_noun_pre3:
-                    di_noun_pr.append(p3+p2+p1)
-        return di_noun_pr   
-    
-    
-    def di_noun_suff_gen(self):
-        """ 
-        Generate diffrent combinations of noun suffixes in Moroccan Arabic
-        """
-        di_noun_su=[]
-
-        for s4 in self.di_noun_suf4:
-            for s1 in self.di_noun_suf1:
-                di_noun_su.append(s1+s4)
-            for s2 in self.di_noun_suf2:
-                di_noun_su.append(s2+s4)
-            for s3 in self.di_noun_suf3:    
-                di_noun_su.append(s3+s4)
-            
-            
-        for s5 in self.di_noun_suf5:
-            for s1 in self.di_noun_suf1:
-                di_noun_su.append(s1+s5)
-            for s3 in self.di_noun_suf3:
-                di_noun_su.append(s3+s5)    
-              
-        for s6 in self.di_noun_suf6:
-            for s2 in self.di_noun_suf2:
-                di_noun_su.append(s2+s6)
-        
-        di_noun_su+=self.di_noun_suf1+self.di_noun_suf2+self.di_noun_suf3+self.di_noun_suf4+self.di_noun_suf5+self.di_noun_suf6
-        return di_noun_su        
-            
-        
-    def di_verb_pref_gen(self):
-        """ 
-        Generate diffrent combinations of verb prefixes in Morocan Arabic
-        """
-        di_verb_pr=[]
-        for p1 in self.di_verb_pre1:
-            for p2 in self.di_verb_pre2:
-                di_verb_pr.append(p1+p2)
-                for p3 in self.di_verb_pre3:
-                    di_verb_pr.append(p3+p1+p2)
-        return di_verb_pr      
-    
-
-    def di_verb_suff_gen(self):
-        """ 
-        Generate diffrent combinations of verb suffixes in Moroccan Arabic
-        """
-        di_verb_su=[]
-        
-        for s1 in self.di_verb_suf1:
-            for s4 in self.di_verb_suf4:
-                di_verb_su.append(s1+s4)    
-            for s5 in self.di_verb_suf5:
-                di_verb_su.append(s1+s5)    
-                 
-        
-        for s6 in self.di_verb_suf6:
-            for s5 in self.di_verb_suf5:
-                di_verb_su.append(s6+s5)
-            for s1 in self.di_verb_suf1:
-                di_verb_su.append(s6+s1)
-                di_verb_su.append(s1+s6+s1)   
-            
-        for s2 in self.di_verb_suf2:
-            for s4 in self.di_verb_suf4:
-                di_verb_su.append(s2+s4)
-            for s5 in self.di_verb_suf5:
-                di_verb_su.append(s2+s5)
-                for s6 in self.di_verb_suf6:
-                    di_verb_su.append(s2+s6+s5) 
-            for s8 in self.di_verb_suf8:
-                di_verb_su.append(s2+s8)
-                for s6 in self.di_verb_suf6:
-                    di_verb_su.append(s2+s6+s8) 
-            for s9 in self.di_verb_suf9:
-                for s6 in self.di_verb_suf6:
-                    di_verb_su.append(s2+s6+s9) 
-            
-        for s3 in self.di_verb_suf3:
-            for s7 in self.di_verb_suf7:
-                di_verb_su.append(s3+s7)
-                for s6 in self.di_verb_suf6:
-                    di_verb_su.append(s3+s6+s7)  
-            for s8 in self.di_verb_suf8:
-                di_verb_su.append(s3+s8)
-                
-            for s6 in self.di_verb_suf6:
-                for s9 in self.di_verb_suf9:
-                    di_verb_su.append(s3+s6+s9)   
-                    
-        for s7 in self.di_verb_suf7:
-            for s1 in self.di_verb_suf1:
-                di_verb_su.append(s1+s7)
-            for s5 in self.di_verb_suf5:
-                di_verb_su.append(s5+s7)
-            for s6 in self.di_verb_suf6:
-                di_verb_su.append(s6+s7)
-                for s5 in self.di_verb_suf5:
-                    di_verb_su.append(s5+s6+s7)    
-        
-                
-        for s8 in self.di_verb_suf8:
-            for s1 in self.di_verb_suf1:
-                di_verb_su.append(s1+s8)
-            for s5 in self.di_verb_suf5:    
-                di_verb_su.append(s5+s8)
-            for s6 in self.di_verb_suf6:
-                di_verb_su.append(s6+s8)
-                for s1 in self.di_verb_suf1:
-                    di_verb_su.append(s1+s6+s8)
-                for s5 in self.di_verb_suf8:
-                    di_verb_su.append(s5+s6+s8)
-            
-        di_verb_su+=self.di_verb_suf1+self.di_verb_suf2+self.di_verb_suf3+self.di_verb_suf4+self.di_verb_suf5+self.di_verb_suf7+self.di_verb_suf8                
-        return di_verb_su
-    
-
-    def neg_pref_gen(self):
-        """ 
-        Generate diffrent combinations of negation prefixes in Moroccan arabic
-        """
-        neg_pr=[]
-        for p2 in self.di_neg_pre2:
-            for p4 in self.di_neg_pre4:
-                neg_pr.append(p2+p4)
-                for p3 in self.di_neg_pre3:
-                    neg_pr.append(p2+p3+p4)
-                    
-            for p1 in self.di_neg_pre1:
-                    neg_pr.append(p1+p2)
-                    for p4 in self.di_neg_pre4:
-                        neg_pr.append(p1+p2+p4)
-                        for p3 in self.di_neg_pre3: 
-                            neg_pr.append(p1+p2+p3+p4) 
-            
-        neg_pr+=self.di_neg_pre2           
-        return neg_pr    
-    
-    def arrange(self,lst):
-        """
-        Sort and store affixes by length  
-        """
-        dc = {}
-        for affix in lst:
-            if len(affix) not in dc:
-                dc[len(affix)] = [affix]
-            elif len(affix) in dc:
-                dc[len(affix)] += [affix]
-                
-        ranged = []
-        for key in sorted(dc,reverse=True):
-            ranged.append(dc[key])
-      
-        return ranged     
- 
-
-    def normalize(self,word):
-        """
-        normalizing Arabic  characters  
-        """
-        word=word.replace("\u0623","\u0627")     #("أ", "ا")
-        word=word.replace("\u0622","\u0627")     #("آ","ا")
-        word=word.replace("\u0625","\u0627")     #("إ","ا")
-        word=word.replace("\u0649","\u064A")     #("ى","ي")
-        word=word.replace("\u0626","\u064A")     #("ئ","ي")
-        word=word.replace("\u0621","\u064A")     #("ء","ي")
-        word=word.replace("\u0624","\u0648")     #("ؤ","و")
-        return word
-    
-    
-    def pref(self,word,affix):
-        """
-        remove the prefix from the word 
-        """
-        
-        for prefs in affix:
-            if len(word)-len(prefs[0])>=3:
-                for pref in prefs:
-                    if word.startswith(pref):
-                        return word[len(pref):]
-        return word
-     
-        
-    def suff(self,word,affix):
-        """
-        remove the suffix from the word 
-        """
-        for suffs in affix:
-            if len(word)-len(suffs[0])>=3:
-                for suff in suffs:
-                    if word.endswith(suff):
-                        return word[:-len(suff)]
-        return word    
-    
-  
-    def pref_tied(self,word,affix_pref, affix_suff):
-        """
-        remove the prefix from the word depending on the suffix
-        """
-             
-        for suffs in affix_suff:
-            if len(word)-len(suffs[0])>=3:
-                for suff in suffs:
-                    for prefs in affix_pref :
-                        if len(word)-len(suffs[0])-len(prefs[0])>=3:
-                            for pref in prefs:
-                                if word.startswith(pref) and word.endswith(suff):
-                                    return word[len(pref):]        
-        return word 
-        
-    
-    def negation(self,word):
-        """
-        remove negation prefix and suffix 
-        remove verb prefix and suffix
-        """
-        affix_pref= self.neg_prefs
-        suffs=self.di_neg_suf1
-        
-        for prefs in affix_pref:
-            if len(word)-len(prefs[0])>=3:
-                for pref in prefs: 
-                    if word.startswith(pref):
-                        for suff in suffs:
-                            if len(word)-len(prefs[0])-len(suff[0])>=3:
-                                if word.endswith(suff):
-                                    word=word[len(pref):-len(suff)]
-                                    word=self.pref(word,self.di_verb_prefs)
-                                    word=self.suff(word,self.full_suffs)
-                                    return word            
-        return word
-    
-   
-    def post(self,word):
-        for suff in self.post_suf1:
-            if len(word)-len(suff)>=3:
-                if word.endswith(suff):
-                    return word[:-len(suff)]
-        return word    
-
-                    
-    def stem_di(self,word):
-        """
-        stem the word according to the Morroccan Arabic option of Samad
-        """
-        
-        word=self.normalize(word)
-        noun=self.pref(word,self.di_noun_prefs)
-        
-        if len(noun)<len(word):
-            noun=self.suff(noun,self.di_noun_suffs)
-            return noun
-        
-        else:
-            verb=self.pref(word,self.di_verb_prefs)
-            if len(verb)<len(word):
-                verb=self.suff(verb,self.di_verb_suffs)
-                return verb
-    
-            else:
-                verb2=self.pref_tied(word,self.verb_prefs,self.verb_suffs)
-                if len(verb2)<len(word):
-                    verb2=self.suff(verb2,self.di_verb_suffs)
-                    return verb2
-                
-                else:
-                    verb_neg=self.negation(word)
-                    if len(verb_neg)<len(word):
-                        if len(verb_neg)<len(verb):
-                            return self.di_neg_pre2[1]+verb_neg
-                        
-                    else:
-                        noun2=self.pref_tied(word,self.noun_joined_prefs,self.noun_suffs)
-                        if len(noun2) < len(word):
-                            noun2=self.suff(noun2,self.di_noun_suffs)
-                            return noun2
-                        
-                        else:
-                            word=self.pref(word,self.full_prefs)
-                            word=self.suff(word,self.full_suffs)
-                            return word
- 
-
-    def stem(self,word):
-        
-        """
-      stem the word  according to the standard Arabic option of Samad
-        """
-        
-        word=self.normalize(word)
-        noun=self.pref(word,self.noun_prefs)
-        
-        if len(noun)<len(word):
-            noun=self.suff(noun,self.noun_suffs)
-            return noun
-        
-        else:
-
-            verb2=self.pref_tied(word,self.verb_prefs,self.verb_suffs)
-            if len(verb2)<len(word):
-                verb2=self.suff(verb2,self.verb_suffs)
-                return verb2
-    
-            else:
-                noun2=self.pref_tied(word,self.noun_joined_prefs,self.noun_suffs)
-                if len(noun2) < len(word):
-                    noun2=self.suff(noun2,self.noun_suffs)
-                    return noun2
-                    
-                else:
-                    word=self.pref(word,self.noun_joined_prefs)
-                    word=self.suff(word,self.standard_suffs)
-                    return word
+
+# Algorithm: Mohcine Maghfour, Abdeljalil Elouardighi (2022)
+# Author: Mohcine Maghfour <maghfour.mohcin@gmail.com>
+
+import hashlib
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict
+from itertools import islice
+
+
+# the two options of the stemmer, by the name of their method
+MODES=("stem","stem_di")
+
+
+def check_mode(mode):
+    """
+    raise ValueError unless mode is one of MODES
+    """
+    if mode not in MODES:
+        raise ValueError("mode must be one of %s, not %r" % (MODES,mode))
+
+
+def gil_enabled():
+    """
+    False on a free-threaded build of Python running without the GIL
+    """
+    # sys._is_gil_enabled() is new in Python 3.13
+    is_gil_enabled=getattr(sys,"_is_gil_enabled",None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+
+class StemCache:
+    """
+    Bounded mapping from input words to their stems that evicts 
+    the least recently used word when full. With the GIL, threads can 
+    share it without a lock: a word evicted by another thread between 
+    two steps is a miss, and the counters are then approximate.
+    """
+    
+    def __init__(self,maxsize):
+        self.maxsize=maxsize
+        self.data=OrderedDict()
+        self.hits=0
+        self.misses=0
+        self.evictions=0
+        
+    
+    def get(self,word):
+        """
+        return the cached stem of the word, or None
+        """
+        data=self.data
+        stem=data.get(word)
+        if stem is not None:
+            try:
+                data.move_to_end(word)
+            except KeyError:
+                pass
+            self.hits+=1
+            return stem
+        self.misses+=1
+        return None
+    
+    
+    def put(self,word,stem):
+        data=self.data
+        data[word]=stem
+        if len(data)>self.maxsize:
+            try:
+                data.popitem(last=False)
+                self.evictions+=1
+            except KeyError:
+                pass
+            
+    
+    def info(self):
+        return {"hits":self.hits,"misses":self.misses,"evictions":self.evictions,
+                "size":len(self.data),"maxsize":self.maxsize}
+    
+    
+    def clear(self):
+        self.data.clear()
+        self.hits=self.misses=self.evictions=0
+        
+
+class SharedStemCache:
+    """
+    StemCache that can be shared by threads: the words are spread 
+    over stripes, each one a StemCache guarded by its own lock
+    """
+    
+    def __init__(self,maxsize,stripes=16):
+        self.maxsize=maxsize
+        self.stripes=tuple(StemCache(-(-maxsize//stripes)) for _ in range(stripes))
+        self.locks=tuple(threading.Lock() for _ in range(stripes))
+        
+    
+    def get(self,word):
+        """
+        return the cached stem of the word, or None
+        """
+        stripe=hash(word)%len(self.stripes)
+        with self.locks[stripe]:
+            return self.stripes[stripe].get(word)
+    
+    
+    def put(self,word,stem):
+        stripe=hash(word)%len(self.stripes)
+        with self.locks[stripe]:
+            self.stripes[stripe].put(word,stem)
+            
+    
+    def info(self):
+        info={"hits":0,"misses":0,"evictions":0,"size":0}
+        for lock,stripe in zip(self.locks,self.stripes):
+            with lock:
+                for key,value in stripe.info().items():
+                    if key in info:
+                        info[key]+=value
+        info["maxsize"]=self.maxsize
+        return info
+    
+    
+    def clear(self):
+        for lock,stripe in zip(self.locks,self.stripes):
+            with lock:
+                stripe.clear()
+                
+
+class CascadeTracer:
+    """
+    Opt-in counters of the stem and stem_di decision cascades: 
+    words that exit at each branch, time spent in each stage 
+    and time spent matching each affix table.
+    
+    It replaces the matching methods of one Samad instance by timed 
+    wrappers, so a stemmer without tracer runs the plain methods.
+    """
+    
+    # (branch, matching call) that opens each stage of the cascades,
+    # the word exits at the branch of the last stage opened 
+    stages={"stem":(("noun",("pref","noun_prefs")),
+                    ("tied_verb",("pref_tied","verb_prefs/verb_suffs")),
+                    ("tied_noun",("pref_tied","noun_joined_prefs/noun_suffs")),
+                    ("fallback",("pref","noun_joined_prefs"))),
+            "stem_di":(("di_noun",("pref","di_noun_prefs")),
+                       ("di_verb",("pref","di_verb_prefs")),
+                       ("tied_verb",("pref_tied","verb_prefs/verb_suffs")),
+                       ("negation",("negation","neg_prefs/neg_suffs")),
+                       ("tied_noun",("pref_tied","noun_joined_prefs/noun_suffs")),
+                       ("fallback",("pref","full_prefs")))}
+    
+    matchers=("pref","suff","pref_tied","negation")
+    
+    def __init__(self,samad):
+        self.samad=samad
+        self.table_names={id(getattr(samad,name)):name for name in samad.table_names}
+        self.openers={mode:{call:index for index,(_,call) in enumerate(stages)} 
+                      for mode,stages in self.stages.items()}
+        self.mode=None
+        self.reset()
+        
+    
+    def reset(self):
+        self.exits={mode:dict.fromkeys((branch for branch,_ in stages),0)
+                    for mode,stages in self.stages.items()}
+        self.stage_seconds={mode:dict.fromkeys(("normalize",)+tuple(branch for branch,_ in stages),0.0)
+                            for mode,stages in self.stages.items()}
+        self.table_calls={}
+        self.table_seconds={}
+        
+    
+    def export(self):
+        """
+        copy of the counters; table times include the matching calls
+        made inside them (negation matches di_verb_prefs and full_suffs)
+        """
+        return {"exits":{mode:dict(exits) for mode,exits in self.exits.items()},
+                "stage_seconds":{mode:dict(times) for mode,times in self.stage_seconds.items()},
+                "tables":{name:{"calls":calls,"seconds":self.table_seconds[name]}
+                          for name,calls in self.table_calls.items()}}
+    
+    
+    def install(self):
+        samad=self.samad
+        self.replaced={name:samad.__dict__[name] for name in self.matchers+("_stem","_stem_di")
+                       if name in samad.__dict__}
+        for name in self.matchers:
+            setattr(samad,name,self.trace_matcher(name,getattr(samad,name)))
+        samad._stem=self.trace_cascade("stem",samad._stem)
+        samad._stem_di=self.trace_cascade("stem_di",samad._stem_di)
+        
+    
+    def uninstall(self):
+        for name in self.matchers+("_stem","_stem_di"):
+            self.samad.__dict__.pop(name,None)
+        self.samad.__dict__.update(self.replaced)
+            
+    
+    def trace_cascade(self,mode,rules):
+        clock=time.perf_counter
+        stages=self.stages[mode]
+        def traced(word):
+            self.mode=mode
+            self.stage=-1
+            self.stage_start=clock()
+            stem=rules(word)
+            self.close_stage(clock())
+            self.exits[mode][stages[self.stage][0]]+=1
+            self.mode=None
+            return stem
+        return traced
+    
+    
+    def close_stage(self,now):
+        stage=self.stages[self.mode][self.stage][0] if self.stage>=0 else "normalize"
+        self.stage_seconds[self.mode][stage]+=now-self.stage_start
+        self.stage_start=now
+        
+    
+    def trace_matcher(self,name,match):
+        clock=time.perf_counter
+        table_names=self.table_names
+        def traced(word,*tables):
+            if tables:
+                table="/".join(table_names.get(id(table),"?") for table in tables)
+            else:
+                table="neg_prefs/neg_suffs"
+            start=clock()
+            if self.mode is not None:
+                stage=self.openers[self.mode].get((name,table))
+                if stage is not None and stage>self.stage:
+                    self.close_stage(start)
+                    self.stage=stage
+            result=match(word,*tables)
+            elapsed=clock()-start
+            self.table_calls[table]=self.table_calls.get(table,0)+1
+            self.table_seconds[table]=self.table_seconds.get(table,0.0)+elapsed
+            return result
+        return traced
+
+
+class Analysis:
+    """
+    Result of Samad.analyze() and Samad.analyze_di(): the stem is 
+    word[start:end] of the normalized word, preceded by restored
+    (the negation "ما" that stem_di puts back, "" otherwise).
+    
+    normalize() maps every letter to one letter, so the offsets 
+    are also those of the stem in the input word.
+    """
+    
+    __slots__=("word","start","end","branch","restored")
+    
+    def __init__(self,word,start,end,branch,restored=""):
+        self.word=word
+        self.start=start
+        self.end=end
+        self.branch=branch
+        self.restored=restored
+        
+    
+    @property
+    def stem(self):
+        return self.restored+self.word[self.start:self.end]
+    
+    
+    @property
+    def prefix(self):
+        return self.word[:self.start]
+    
+    
+    @property
+    def suffix(self):
+        return self.word[self.end:]
+    
+    
+    @property
+    def prefix_length(self):
+        return self.start
+    
+    
+    @property
+    def suffix_length(self):
+        return len(self.word)-self.end
+    
+    
+    def __eq__(self,other):
+        if not isinstance(other,Analysis):
+            return NotImplemented
+        return (self.word,self.start,self.end,self.branch,self.restored)==\
+               (other.word,other.start,other.end,other.branch,other.restored)
+    
+    
+    def __repr__(self):
+        return "Analysis(%r, %d, %d, %r)" % (self.word,self.start,self.end,self.branch)
+        
+
+class Samad:
+    """
+SAMAD stemmer - Standard Arabic and Moroccan Arabic Dialect Stemmer - : 
+is a light Arabic stemmer that removes the common prefixes and 
+suffixes from Arabic words. Besides the stemming of standard Arabic, 
+SAMAD stemmer offers the possibility of stemming words that
+belong to the Moroccan dialectal Arabic.
+
+Samad.stem(word) returns the stem of the input word according to the standard Arabic option.
+Samad.stem_di(word) returns the stem of the input word according to the Moroccan Arabic option.
+
+Samad(cache_size) keeps the stems of the last cache_size words of each option, 
+cache_size=0 disables the caches.
+
+The compiled affix tables are immutable and shared by all the instances, so
+one stemmer can be used by many threads. With the GIL the default caches 
+(see StemCache) tolerate concurrent use; Samad(thread_safe=True), and every 
+stemmer of a free-threaded build running without the GIL, gets caches with 
+locks and exact counters instead (see SharedStemCache). The instrumentation 
+of enable_stats() is not thread-safe.
+
+Samad(engine="regex") matches the affixes with compiled regular expressions 
+(see RegexSamad) instead of the default length-indexed sets (engine="index").
+
+Samad.analyze(word) and Samad.analyze_di(word) return the offsets of the stem 
+in the word and the branch of the option that produced it (see Analysis).
+
+    """
+    
+
+    # noun prefixes in standard Arabic
+    
+    noun_pre1= ("\u0627\u0644",)    #["ال"]
+    noun_pre2= ("\u0644\u0644",)    #["لل"]
+    noun_pre3= ("\u0628","\u0643") #["ك","ب"]
+    noun_pre4= ("\u0641","\u0648") #["و","ف"]    
+    noun_pre5= ("\u0644",)          #["ل"]
+
+    # noun suffixes in standard Arabic
+               
+    noun_suf1=("\u0648\u064A\u062A","\u0648\u064A\u0627\u062A",
+               "\u064A\u0627","\u064A\u062A","\u064A","\u0648",
+               "\u0627","\u0647\u0627\u062A","\u064A\u0627\u062A",
+               "\u0627\u062A","\u062A")
+               #["ت","ات","يات","هات","ا","و","ي","يت","يا","ويات","ويت"]
+                    
+    noun_suf2=("\u0647","\u0647\u0627","\u0647\u0645\u0627",
+              "\u0647\u0645","\u0647\u0646","\u0643",
+               "\u0643\u064A","\u0643\u0645\u0627",
+              "\u0643\u0645","\u064A","\u0646\u0627")
+             #["ه","ها","هما","هم","هن","ك","كي","كما","كم", "ي","نا"]
+                  
+    noun_suf3=("\u064A\u0629","\u0648\u0646","\u064A\u0646",
+              "\u064A\u0648\u0646","\u064A\u064A\u0646",
+              "\u062A\u064A\u0646","\u0627\u0646","\u0629",
+              "\u064A\u0627","\u0648\u064A\u0629")
+              #["ية","ون","ين","يون","يين","تين","ان","ة","يا","وية"]
+
+    # verb prefixes in standard Arabic  
+                                     
+    verb_pre1=("\u062A","\u064A","\u0646","\u0627") 
+                                #["ت","ي","ن","ا"]
+    
+    verb_pre2=("\u0633","\u0644")   #["س","ل"]
+    verb_pre3=("\u0648","\u0641")   #["و","ف"]
+    
+    # verb suffixes in standard arabic
+    
+                                            
+    verb_suf1=("\u0648\u0646","\u0646","\u0627\u0646",
+              "\u064A\u0646","\u062A","\u0627","\u0648") 
+                       #["ون","ن","ان","ين","ت","ا","و"] 
+    
+                                                     
+    verb_suf2=("\u064A","\u062A\u0645\u0648","\u062A\u0645\u0627")
+                                                 #["ي","تمو","تما"]
+    
+    verb_suf3=("\u0646\u0627",)   #["نا"]  
+    verb_suf4=("\u0646\u064A",)   #["ني"]
+   
+                                     
+    verb_suf5=("\u0647","\u0647\u0627","\u0647\u0645\u0627",
+               "\u0647\u0645","\u0647\u0646") 
+                                #["ه","ها","هما","هم","هن"] 
+    
+                                           
+    verb_suf6=("\u0643","\u0643\u064A","\u0643\u0645\u0627",
+               "\u0643\u0645")
+                                      #["ك","كي","كما","كم"]            
+    
+                                                                       
+    verb_suf7=("\u0648\u0627","\u062A\u0645","\u064A\u0627")
+                                             #["وا","تم","يا"]
+
+  ## Dialectal Affixes  
+
+    # noun prefixes in Morrocan Arabic
+
+    di_noun_pre1=("\u0627\u0644",)  #["ال"]
+    
+                                             
+    di_noun_pre2=("\u064A","\u062A","\u062F","\u0639","\u063A")
+                                        #["ي","ت","د","ع","غ"]  
+    
+                                                
+    di_noun_pre3=("\u0627\u0648","\u0648\u0627","\u0648")
+                                           #["او","وا","و"]
+          
+    # noun suffixes in Morrocan Arabic
+    
+    di_noun_suf1=("\u0627\u062A","\u062A") #["ات","ت"]
+    di_noun_suf2=("\u0627",)                #["ا"]
+    di_noun_suf3=("\u064A\u0646",)          #["ين"]
+    
+                                 
+    di_noun_suf4=("\u0647\u0645","\u0647\u0648\u0645",
+                 "\u0647\u0627","\u0643\u0645","\u0643\u0648\u0645",
+                 "\u0643\u064A","\u0643")
+                            #["هم","هوم","ها","كم","كوم","كي","ك"]
+    
+    di_noun_suf5=("\u0648","\u064A") #["و","ي"] 
+    
+                                               
+    di_noun_suf6=("\u0647","\u0646\u064A","\u0646\u0627") 
+                                          #["ه","ني","نا"]
+    
+    # verb prefixes in Moroccan Arabic
+    
+                               
+    di_verb_pre1=("\u0643\u0627","\u0639\u0627","\u063A\u0627",
+                  "\u062A\u0627","\u0643","\u0639","\u063A",
+                 "\u062A")
+                 #["كا","عا","غا","تا","ك","ع","غ","ت"]
+                                  
+    di_verb_pre2=("\u0646","\u062A","\u064A")
+                             #["ن","ت","ي"] 
+    
+                                                    
+    di_verb_pre3=("\u0627\u0648","\u0648\u0627","\u0648")
+                                           #["او","وا","و"]
+    
+    
+    di_verb_suf1=("\u0648",)  #["و"]
+    
+                                               
+    di_verb_suf2=("\u064A","\u062A\u064A","\u062A\u0648")
+                                          #["ي","تي","تو"]
+    
+                                    
+    di_verb_suf3=("\u062A","\u0627\u062A")  #["ات","ت"]
+    
+    di_verb_suf4=("\u0646\u064A",)  #["ني"]
+    
+    di_verb_suf5=("\u0646\u0627",)  #["نا"]
+    
+    di_verb_suf6=("\u0644","\u0644\u064A") #["لي","ل"]
+    
+    di_verb_suf7=("\u0643","\u0643\u0645","\u0643\u0648\u0645")
+                                              #["كم","ك","كوم"]
+    
+                                           
+    di_verb_suf8=("\u0647","\u0647\u0627","\u0647\u0645",
+                  "\u0647\u0648\u0645") 
+                                  #["ه","ها","هوم","هم"]
+    
+    di_verb_suf9=("\u064A","\u064A\u0627") #["يا","ي"] 
+  
+   #  negation prefixes in Moroccan Arabic
+                                               
+    di_neg_pre1=("\u0627\u0648","\u0648\u0627","\u0648")
+                                          #["او","وا","و"]
+    
+    di_neg_pre2=("\u0645","\u0645\u0627") #["م","ما"]
+    
+                              
+    di_neg_pre3=("\u0643\u0627","\u0639\u0627","\u063A\u0627",
+                  "\u062A\u0627","\u0643","\u0639","\u063A",
+                 "\u062A") 
+                        #["كا","عا","غا","تا","ك","ع","غ","ت"] 
+    
+    di_neg_pre4=("\u0646","\u062A","\u064A") #["ن","ت","ي"]
+    
+    # negation suffixes in Moroccan Arabic
+    di_neg_suf1=("\u0634","\u0634\u064A") #["شي","ش"]
+    
+    # post normalisation suffixes 
+                                      
+    post_suf1=("\u0627","\u0648","\u064A","\u064A")
+                                 #["ا","و","ي","ت"]
+
+    # harakat, superscript alef and tatweel, removed from whole texts 
+    # after normalize() by normalize_text()
+    
+    text_deletions=re.compile("[\u064B-\u065F\u0670\u0640]")
+    
+    arabic_word=re.compile("([\u0621-\u064A\u0671-\u06D3]+)")
+    
+    # words that only occur in Moroccan Arabic, used by stem_auto()
+    
+    dialect_words=frozenset(("\u0648\u0627\u0634","\u0634\u0646\u0648","\u0627\u0634\u0646\u0648","\u0634\u0643\u0648\u0646","\u0639\u0644\u0627\u0634",
+                             #["واش","شنو","اشنو","شكون","علاش"]
+                             "\u0643\u064A\u0641\u0627\u0634","\u0641\u064A\u0646","\u0641\u0627\u064A\u0646","\u0645\u0646\u064A\u0646","\u0634\u062D\u0627\u0644",
+                             #["كيفاش","فين","فاين","منين","شحال"]
+                             "\u062F\u0627\u0628\u0627","\u062F\u064A\u0627\u0644","\u062F\u064A\u0627\u0644\u064A","\u062F\u064A\u0627\u0644\u0643","\u062F\u064A\u0627\u0644\u0648",
+                             #["دابا","ديال","ديالي","ديالك","ديالو"]
+                             "\u062F\u064A\u0627\u0644\u0647\u0627","\u062F\u064A\u0627\u0644\u0646\u0627","\u062F\u064A\u0627\u0644\u0643\u0645","\u062F\u064A\u0627\u0644\u0647\u0645","\u0628\u0632\u0627\u0641",
+                             #["ديالها","ديالنا","ديالكم","ديالهم","بزاف"]
+                             "\u0648\u0627\u0644\u0648","\u0643\u0627\u064A\u0646","\u0643\u0627\u064A\u0646\u0629","\u0645\u0627\u0643\u0627\u064A\u0646","\u0645\u0627\u0634\u064A",
+                             #["والو","كاين","كاينة","ماكاين","ماشي"]
+                             "\u063A\u0627\u062F\u064A","\u063A\u0627\u062F\u064A\u0629","\u062D\u064A\u062A","\u0647\u0627\u062F\u0634\u064A","\u062F\u0627\u0643\u0634\u064A",
+                             #["غادي","غادية","حيت","هادشي","داكشي"]
+                             "\u0643\u0648\u0644\u0634\u064A","\u0647\u0627\u062F","\u0647\u0627\u062F\u0648","\u062F\u064A\u0643","\u062F\u0627\u0643",
+                             #["كولشي","هاد","هادو","ديك","داك"]
+                             "\u0631\u0627\u0647","\u0631\u0627\u0646\u064A","\u0631\u0627\u0643","\u0631\u0627\u0647\u0627","\u0628\u063A\u064A\u062A",
+                             #["راه","راني","راك","راها","بغيت"]
+                             "\u062E\u0627\u0635\u0646\u064A","\u0645\u0632\u064A\u0627\u0646","\u0632\u0648\u064A\u0646","\u0648\u0627\u062E\u0627","\u064A\u0627\u0643",
+                             #["خاصني","مزيان","زوين","واخا","ياك"]
+                             "\u0639\u0627\u0641\u0627\u0643","\u0635\u0627\u0641\u064A","\u0646\u062A\u0627","\u0646\u062A\u064A","\u0646\u062A\u0648\u0645\u0627",
+                             #["عافاك","صافي","نتا","نتي","نتوما"]
+                             "\u062D\u0646\u0627","\u0647\u0648\u0645\u0627","\u0644\u064A\u0627","\u0634\u0648\u064A\u0629","\u0628\u062D\u0627\u0644",
+                             #["حنا","هوما","ليا","شوية","بحال"]
+                             "\u0628\u0627\u0634","\u0628\u0644\u064A","\u0645\u0644\u064A","\u062F\u064A\u0645\u0627"))
+                             #["باش","بلي","ملي","ديما"]
+    
+    # aspect markers of Moroccan verbs (كا, تا, غا), counted by dialect_score() 
+    # when a person prefix follows them
+    
+    dialect_aspects=("\u0643\u0627","\u062A\u0627","\u063A\u0627")
+    
+    dialect_threshold=0.2
+
+    # Combined affixes, compiled once per class by compile_tables()
+    
+    table_names=("noun_prefs","noun_suffs","verb_prefs","verb_suffs",
+                 "di_noun_prefs","di_noun_suffs","di_verb_prefs","di_verb_suffs",
+                 "neg_prefs","neg_suffs","noun_joined_suffs","noun_joined_prefs",
+                 "full_suffs","full_prefs","standard_suffs","standard_prefs")
+    
+    engine="index"
+    
+    # affix matching engines, by name
+    engines={}
+    
+    # declarative affix profile the tables are compiled from (see SAMAD_Profiles),
+    # None for the combinations of the *_gen() methods
+    profile=None
+    
+    # branches of the stem and stem_di cascades, in the order they are tried;
+    # span_arrays() reports the index of the branch in this order
+    branches={"stem":("noun","tied_verb","tied_noun","fallback"),
+              "stem_di":("di_noun","di_verb","tied_verb","negation","tied_noun","fallback")}
+    
+    # guards the compilation of the tables by the first instance
+    _tables_lock=threading.Lock()
+    
+    def __new__(cls,cache_size=8192,engine=None,thread_safe=False):
+        if engine is not None:
+            if engine not in cls.engines or not issubclass(cls.engines[engine],cls):
+                raise ValueError("unknown engine %r for %s" % (engine,cls.__name__))
+            cls=cls.engines[engine]
+        return super().__new__(cls)
+    
+    
+    def __init__(self,cache_size=8192,engine=None,thread_safe=False):
+        cls=type(self)
+        if "_tables" not in cls.__dict__:
+            with cls._tables_lock:
+                if "_tables" not in cls.__dict__:
+                    path=os.environ.get("SAMAD_TABLES")
+                    if not (path and os.path.exists(path) and cls.load_tables(path)):
+                        cls.install_tables(self.compile_tables())
+        
+        # without the GIL the OrderedDict of StemCache is not safe to share
+        cache=SharedStemCache if thread_safe or not gil_enabled() else StemCache
+        self.stem_cache=cache(cache_size) if cache_size else None
+        self.stem_di_cache=cache(cache_size) if cache_size else None
+        self.tracer=None
+        
+    
+    def cache_info(self):
+        """
+        hits, misses and evictions of the stem and stem_di caches
+        """
+        return {"stem":self.stem_cache.info() if self.stem_cache else None,
+                "stem_di":self.stem_di_cache.info() if self.stem_di_cache else None}
+    
+    
+    def cache_clear(self):
+        for cache in (self.stem_cache,self.stem_di_cache):
+            if cache is not None:
+                cache.clear()
+    
+    
+    def enable_stats(self):
+        """
+        start counting the branches taken by the words that are not cached
+        """
+        if self.tracer is None:
+            self.tracer=CascadeTracer(self)
+            self.tracer.install()
+    
+    
+    def disable_stats(self):
+        if self.tracer is not None:
+            self.tracer.uninstall()
+            self.tracer=None
+    
+    
+    def stats(self):
+        """
+        branch exits, stage times and affix table times since 
+        enable_stats() or reset_stats(), None if disabled
+        """
+        return self.tracer.export() if self.tracer else None
+    
+    
+    def reset_stats(self):
+        if self.tracer is not None:
+            self.tracer.reset()
+    
+    
+    def compile_tables(self):
+        """
+        Combine and index the affixes of every table used by the stemmer
+        """
+        if self.profile is not None:
+            return self.profile.compile(self)
+        tables={}
+        tables["noun_prefs"]= self.index(self.noun_pref_gen())
+        tables["noun_suffs"]= self.index(self.noun_suff_gen())
+        
+        tables["verb_prefs"]= self.index(self.verb_pref_gen()) 
+        tables["verb_suffs"]= self.index(self.verb_suff_gen()) 
+        
+        tables["di_noun_prefs"]=self.index(self.di_noun_pref_gen()+self.noun_pref_gen())
+        tables["di_noun_suffs"]=self.index(self.di_noun_suff_gen()+self.noun_suff_gen())
+        
+        tables["di_verb_prefs"]= self.index(self.di_verb_pref_gen()) 
+        tables["di_verb_suffs"]= self.index(self.di_verb_suff_gen()+self.verb_suff_gen()) 
+        
+        tables["neg_prefs"]= self.index(self.neg_pref_gen())
+        tables["neg_suffs"]= self.index(self.di_neg_suf1)
+        
+        tables["noun_joined_suffs"]=self.index(self.noun_suf2+self.noun_suf3)
+        tables["noun_joined_prefs"]=self.index(self.noun_joined_pref_gen())
+        
+        tables["full_suffs"]=self.index(self.noun_suff_gen()+self.di_noun_suff_gen()+self.verb_suff_gen()+self.di_verb_suff_gen())
+        tables["full_prefs"]=self.index(self.noun_pref_gen()+self.di_noun_pref_gen() +self.verb_pref_gen()+self.di_verb_pref_gen())
+        
+        tables["standard_suffs"]=self.index(self.noun_suff_gen()+self.verb_suff_gen())
+        tables["standard_prefs"]=self.index(self.noun_pref_gen()+self.verb_pref_gen())
+        return tables
+    
+    
+    @classmethod
+    def install_tables(cls,tables):
+        """
+        Share compiled tables between all the instances of the class
+        """
+        for name in cls.table_names:
+            setattr(cls,name,tables[name])
+        # set last: instances only read the tables once _tables exists
+        cls._tables=tables
+    
+    
+    @classmethod
+    def fingerprint(cls):
+        """
+        Hash of the affix inventories the compiled tables derive from; 
+        the engines give the same stems, so it does not depend on the engine
+        """
+        affixes=[(name,getattr(cls,name)) for name in dir(cls)
+                 if re.fullmatch(r"\w+_(pre|suf)\d",name)]
+        if cls.profile is not None:
+            affixes.append(("profile",cls.profile.content_hash(cls)))
+        return hashlib.sha1(repr(affixes).encode("utf-8")).hexdigest()
+    
+    
+    @classmethod
+    def save_tables(cls,path):
+        """
+        Write the compiled tables to a pickle file that load_tables() 
+        can restore without recombining the affixes
+        """
+        if "_tables" not in cls.__dict__:
+            cls()
+        with open(path,"wb") as f:
+            # the compiled tables themselves differ from one engine to the other
+            pickle.dump(((cls.engine,cls.fingerprint()),cls._tables),f,pickle.HIGHEST_PROTOCOL)
+    
+    
+    @classmethod
+    def load_tables(cls,path):
+        """
+        Install the tables saved by save_tables(); 
+        return False if they were built from other affix inventories 
+        or for another engine
+        """
+        with open(path,"rb") as f:
+            fingerprint,tables=pickle.load(f)
+        if fingerprint!=(cls.engine,cls.fingerprint()):
+            return False
+        cls.install_tables(tables)
+        return True
+        
+
+    # combining affixes in standard Arabic 
+        
+    def noun_pref_gen(self):
+        """ 
+        Generate diffrent combinations of noun prefixes in standard Arabic
+        """
+        noun_pr=[]
+        for p1 in self.noun_pre1:
+            noun_pr.append(p1)
+            for p3 in self.noun_pre3:
+                noun_pr.append(p3+p1)
+            for p4 in self.noun_pre4:
+                noun_pr.append(p4+p1)
+                for p3 in self.noun_pre3:
+                    noun_pr.append(p4+p3+p1)
+                    
+        for p2 in self.noun_pre2:
+            noun_pr.append(p2)
+            for p4 in self.noun_pre4:
+                noun_pr.append(p4+p2)
+        return noun_pr
+    
+    
+    def noun_suff_gen(self):
+        """ 
+        Generate diffrent combinations of noun suffixes in standard Arabic
+        """
+        noun_su=[]
+        for s1 in self.noun_suf1:
+            for s2 in self.noun_suf2:    
+                noun_su.append(s1+s2)
+        noun_su+=self.noun_suf1+self.noun_suf2+ self.noun_suf3       
+        return noun_su
+     
+    def noun_joined_pref_gen(self):
+        joined_pr=[]
+        for p4 in self.noun_pre4:
+            for p5 in self.noun_pre5:
+                joined_pr.append(p4+p5)
+        joined_pr+=self.noun_pre3+self.noun_pre4+self.noun_pre5
+        return joined_pr
+    
+    
+    def verb_pref_gen(self):
+        """ 
+        Generate diffrent combinations of verb prefixes in standard Arabic
+        """
+        verb_pr=[]
+        for p1 in self.verb_pre1:
+            verb_pr.append(p1)
+            for p2 in self.verb_pre2:
+                verb_pr.append(p2+p1)
+                for p3 in self.verb_pre3:
+                    verb_pr.append(p3+p2+p1)
+            for p3 in self.verb_pre3:
+                verb_pr.append(p3+p1)    
+        return verb_pr        
+
+
+    def verb_suff_gen(self):
+        """ 
+        Generate diffrent combinations of verb suffixes in standard Arabic
+        """
+        verb_su=[]
+        for s1 in self.verb_suf1:
+            for s3 in self.verb_suf3:
+                verb_su.append(s1+s3)
+            for s4 in self.verb_suf4:
+                verb_su.append(s1+s4)
+            for s5 in self.verb_suf5:
+                verb_su.append(s1+s5)
+            for s6 in self.verb_suf6:
+                verb_su.append(s1+s6)
+        
+        for s2 in self.verb_suf2:
+            for s3 in self.verb_suf3:
+                verb_su.append(s2+s3)
+            for s4 in self.verb_suf4:    
+                verb_su.append(s2+s4)
+            for s5 in self.verb_suf5:
+                verb_su.append(s2+s5)
+            
+        for s5 in self.verb_suf5:
+            for s3 in self.verb_suf3:
+                verb_su.append(s3+s5)
+           
+        for s6 in self.verb_suf6:
+            for s3 in self.verb_suf3:
+                verb_su.append(s3+s6)    
+                
+                
+        verb_su+=self.verb_suf1+self.verb_suf2+self.verb_suf5+self.verb_suf6+self.verb_suf7+self.verb_suf3+self.verb_suf4
+        return verb_su
+        
+
+        
+    # combining affixes in Moroccan Arabic
+    
+    def di_noun_pref_gen(self):
+        """ 
+        Generate diffrent combinations of noun prefixes in Morrocan Arabic
+        """
+        di_noun_pr=[]
+        for p1 in self.di_noun_pre1:
+            for p2 in self.di_noun_pre2:
+                di_noun_pr.append(p2+p1)
+                for p3 in self.di_noun_pre3:
+                    di_noun_pr.append(p3+p2+p1)
+        return di_noun_pr   
+    
+    
+    def di_noun_suff_gen(self):
+        """ 
+        Generate diffrent combinations of noun suffixes in Moroccan Arabic
+        """
+        di_noun_su=[]
+
+        for s4 in self.di_noun_suf4:
+            for s1 in self.di_noun_suf1:
+                di_noun_su.append(s1+s4)
+            for s2 in self.di_noun_suf2:
+                di_noun_su.append(s2+s4)
+            for s3 in self.di_noun_suf3:    
+                di_noun_su.append(s3+s4)
+            
+            
+        for s5 in self.di_noun_suf5:
+            for s1 in self.di_noun_suf1:
+                di_noun_su.append(s1+s5)
+            for s3 in self.di_noun_suf3:
+                di_noun_su.append(s3+s5)    
+              
+        for s6 in self.di_noun_suf6:
+            for s2 in self.di_noun_suf2:
+                di_noun_su.append(s2+s6)
+        
+        di_noun_su+=self.di_noun_suf1+self.di_noun_suf2+self.di_noun_suf3+self.di_noun_suf4+self.di_noun_suf5+self.di_noun_suf6
+        return di_noun_su        
+            
+        
+    def di_verb_pref_gen(self):
+        """ 
+        Generate diffrent combinations of verb prefixes in Morocan Arabic
+        """
+        di_verb_pr=[]
+        for p1 in self.di_verb_pre1:
+            for p2 in self.di_verb_pre2:
+                di_verb_pr.append(p1+p2)
+                for p3 in self.di_verb_pre3:
+                    di_verb_pr.append(p3+p1+p2)
+        return di_verb_pr      
+    
+
+    def di_verb_suff_gen(self):
+        """ 
+        Generate diffrent combinations of verb suffixes in Moroccan Arabic
+        """
+        di_verb_su=[]
+        
+        for s1 in self.di_verb_suf1:
+            for s4 in self.di_verb_suf4:
+                di_verb_su.append(s1+s4)    
+            for s5 in self.di_verb_suf5:
+                di_verb_su.append(s1+s5)    
+                 
+        
+        for s6 in self.di_verb_suf6:
+            for s5 in self.di_verb_suf5:
+                di_verb_su.append(s6+s5)
+            for s1 in self.di_verb_suf1:
+                di_verb_su.append(s6+s1)
+                di_verb_su.append(s1+s6+s1)   
+            
+        for s2 in self.di_verb_suf2:
+            for s4 in self.di_verb_suf4:
+                di_verb_su.append(s2+s4)
+            for s5 in self.di_verb_suf5:
+                di_verb_su.append(s2+s5)
+                for s6 in self.di_verb_suf6:
+                    di_verb_su.append(s2+s6+s5) 
+            for s8 in self.di_verb_suf8:
+                di_verb_su.append(s2+s8)
+                for s6 in self.di_verb_suf6:
+                    di_verb_su.append(s2+s6+s8) 
+            for s9 in self.di_verb_suf9:
+                for s6 in self.di_verb_suf6:
+                    di_verb_su.append(s2+s6+s9) 
+            
+        for s3 in self.di_verb_suf3:
+            for s7 in self.di_verb_suf7:
+                di_verb_su.append(s3+s7)
+                for s6 in self.di_verb_suf6:
+                    di_verb_su.append(s3+s6+s7)  
+            for s8 in self.di_verb_suf8:
+                di_verb_su.append(s3+s8)
+                
+            for s6 in self.di_verb_suf6:
+                for s9 in self.di_verb_suf9:
+                    di_verb_su.append(s3+s6+s9)   
+                    
+        for s7 in self.di_verb_suf7:
+            for s1 in self.di_verb_suf1:
+                di_verb_su.append(s1+s7)
+            for s5 in self.di_verb_suf5:
+                di_verb_su.append(s5+s7)
+            for s6 in self.di_verb_suf6:
+                di_verb_su.append(s6+s7)
+                for s5 in self.di_verb_suf5:
+                    di_verb_su.append(s5+s6+s7)    
+        
+                
+        for s8 in self.di_verb_suf8:
+            for s1 in self.di_verb_suf1:
+                di_verb_su.append(s1+s8)
+            for s5 in self.di_verb_suf5:    
+                di_verb_su.append(s5+s8)
+            for s6 in self.di_verb_suf6:
+                di_verb_su.append(s6+s8)
+                for s1 in self.di_verb_suf1:
+                    di_verb_su.append(s1+s6+s8)
+                for s5 in self.di_verb_suf8:
+                    di_verb_su.append(s5+s6+s8)
+            
+        di_verb_su+=self.di_verb_suf1+self.di_verb_suf2+self.di_verb_suf3+self.di_verb_suf4+self.di_verb_suf5+self.di_verb_suf7+self.di_verb_suf8                
+        return di_verb_su
+    
+
+    def neg_pref_gen(self):
+        """ 
+        Generate diffrent combinations of negation prefixes in Moroccan arabic
+        """
+        neg_pr=[]
+        for p2 in self.di_neg_pre2:
+            for p4 in self.di_neg_pre4:
+                neg_pr.append(p2+p4)
+                for p3 in self.di_neg_pre3:
+                    neg_pr.append(p2+p3+p4)
+                    
+            for p1 in self.di_neg_pre1:
+                    neg_pr.append(p1+p2)
+                    for p4 in self.di_neg_pre4:
+                        neg_pr.append(p1+p2+p4)
+                        for p3 in self.di_neg_pre3: 
+                            neg_pr.append(p1+p2+p3+p4) 
+            
+        neg_pr+=self.di_neg_pre2           
+        return neg_pr    
+    
+    def arrange(self,lst):
+        """
+        Sort and store affixes by length  
+        """
+        dc = {}
+        for affix in lst:
+            if len(affix) not in dc:
+                dc[len(affix)] = [affix]
+            elif len(affix) in dc:
+                dc[len(affix)] += [affix]
+                
+        ranged = []
+        for key in sorted(dc,reverse=True):
+            ranged.append(dc[key])
+      
+        return ranged
+    
+    def index(self,lst):
+        """
+        Index affixes by length, longest first, as (length, frozenset) pairs
+        so that matching costs one slice and one lookup per length
+        """
+        return tuple((len(affixes[0]),frozenset(affixes)) 
+                     for affixes in self.arrange(lst))
+ 
+
+    def normalize(self,word):
+        """
+        normalizing Arabic  characters  
+        """
+        word=word.replace("\u0623","\u0627")     #("أ", "ا")
+        word=word.replace("\u0622","\u0627")     #("آ","ا")
+        word=word.replace("\u0625","\u0627")     #("إ","ا")
+        word=word.replace("\u0649","\u064A")     #("ى","ي")
+        word=word.replace("\u0626","\u064A")     #("ئ","ي")
+        word=word.replace("\u0621","\u064A")     #("ء","ي")
+        word=word.replace("\u0624","\u0648")     #("ؤ","و")
+        return word
+    
+    
+    def normalize_text(self,text):
+        """
+        normalize the text and remove harakat and tatweel; the str.replace 
+        chain of normalize() and one regex pass are faster than str.translate
+        """
+        return self.text_deletions.sub("",self.normalize(text))
+    
+    
+    def tokenize(self,text):
+        """
+        normalize the text, remove harakat and tatweel, 
+        and return its Arabic words
+        """
+        return self.arabic_word.findall(self.normalize_text(text))
+    
+    
+    def stem_text(self,text):
+        """
+        stem every Arabic word of the text according to the standard Arabic option,
+        the rest of the text is left as it is
+        """
+        return self.stem_words_in(text,self.stem)
+    
+    
+    def stem_di_text(self,text):
+        """
+        stem every Arabic word of the text according to the Moroccan Arabic option,
+        the rest of the text is left as it is
+        """
+        return self.stem_words_in(text,self.stem_di)
+    
+    
+    def stem_text_many(self,texts,mode="stem",tokens=False):
+        """
+        stem_text() or stem_di_text() of a list of texts (None for missing
+        texts) with one deduplicated batch call for all their Arabic words,
+        or with tokens=True the lists of the stems of each text
+        """
+        check_mode(mode)
+        parts=[self.split_words(text) if text is not None else None for text in texts]
+        stems=iter(getattr(self,mode+"_many")([word for text in parts if text is not None for word in text[1::2]]))
+        stemmed=[]
+        for text in parts:
+            if text is None:
+                stemmed.append(None)
+                continue
+            words=[next(stems) for _ in range(len(text)//2)]
+            if tokens:
+                stemmed.append(words)
+            else:
+                text[1::2]=words
+                stemmed.append("".join(text))
+        return stemmed
+    
+    
+    def split_words(self,text):
+        """
+        normalize the text like tokenize() and split it around its Arabic 
+        words, which are at the odd indices of the list
+        """
+        # the pattern has one group, so split() puts the Arabic words at odd indices
+        return self.arabic_word.split(self.normalize_text(text))
+    
+    
+    def stem_words_in(self,text,stem):
+        parts=self.split_words(text)
+        parts[1::2]=self.unique_map(stem,parts[1::2])
+        return "".join(parts)
+    
+    
+    def dialect_score(self,words):
+        """
+        weighted rate of Moroccan Arabic markers among normalized words: 
+        dialect-only words and negations count twice, verbs that start with 
+        an aspect marker and a person prefix (e.g. كاي, تان, غان) once
+        
+        the other dialect verb prefixes (e.g. كت, عن, تت) also start many 
+        standard Arabic words, so they are not counted
+        """
+        if not words:
+            return 0.0
+        dialect_words=self.dialect_words
+        neg_ends=tuple(self.di_neg_suf1)
+        aspects=tuple(aspect+person for aspect in self.dialect_aspects for person in self.di_verb_pre2)
+        hits=0
+        # each distinct word is checked once
+        for word,count in Counter(words).items():
+            if word in dialect_words:
+                hits+=2*count
+            elif word.endswith(neg_ends) and self.negation(word)!=word:
+                hits+=2*count
+            elif len(word)>=6 and word.startswith(aspects):
+                # at least three letters are left after the aspect and the person
+                hits+=count
+        return hits/len(words)
+    
+    
+    def stem_auto(self,text,threshold=None):
+        """
+        stem the text with the Moroccan Arabic option if its dialect score 
+        reaches the threshold, with the standard Arabic option otherwise
+        """
+        if threshold is None:
+            threshold=self.dialect_threshold
+        parts=self.split_words(text)
+        words=parts[1::2]
+        stem=self.stem_di if self.dialect_score(words)>=threshold else self.stem
+        parts[1::2]=self.unique_map(stem,words)
+        return "".join(parts)
+    
+    
+    def stem_auto_many(self,texts,threshold=None):
+        """
+        stem_auto() each text of a list or an iterable, each text being routed on its own
+        """
+        return [self.stem_auto(text,threshold) for text in texts]
+    
+    
+    def pref(self,word,affix):
+        """
+        remove the longest prefix of the indexed affixes from the word 
+        """
+        n=len(word)
+        for size,prefs in affix:
+            if n-size>=3 and word[:size] in prefs:
+                return word[size:]
+        return word
+     
+        
+    def suff(self,word,affix):
+        """
+        remove the longest suffix of the indexed affixes from the word 
+        """
+        n=len(word)
+        for size,suffs in affix:
+            if n-size>=3 and word[-size:] in suffs:
+                return word[:-size]
+        return word    
+    
+  
+    def pref_tied(self,word,affix_pref, affix_suff):
+        """
+        remove the prefix from the word depending on the suffix
+        
+        (prefix length, suffix length) pairs are tried longest suffix first,
+        then longest prefix, each with one set lookup per length 
+        """
+        n=len(word)
+        for suff_size,suffs in affix_suff:
+            if n-suff_size>=3 and word[-suff_size:] in suffs:
+                for pref_size,prefs in affix_pref:
+                    if n-suff_size-pref_size>=3 and word[:pref_size] in prefs:
+                        return word[pref_size:]
+        return word 
+        
+    
+    def negation(self,word):
+        """
+        remove negation prefix and suffix 
+        remove verb prefix and suffix
+        """
+        n=len(word)
+        for pref_size,prefs in self.neg_prefs:
+            # a single letter is reserved for the negation suffix,
+            # whatever its actual length 
+            if n-pref_size>=4 and word[:pref_size] in prefs:
+                for suff_size,suffs in self.neg_suffs:
+                    if word[-suff_size:] in suffs:
+                        word=word[pref_size:-suff_size]
+                        word=self.pref(word,self.di_verb_prefs)
+                        word=self.suff(word,self.full_suffs)
+                        return word            
+        return word
+    
+   
+    def pref_span(self,word,start,end,affix):
+        """
+        pref() on word[start:end]: return the start of the rest of the word
+        """
+        n=end-start
+        for size,prefs in affix:
+            if n-size>=3 and word[start:start+size] in prefs:
+                return start+size
+        return start
+    
+    
+    def suff_span(self,word,start,end,affix):
+        """
+        suff() on word[start:end]: return the end of the rest of the word
+        """
+        n=end-start
+        for size,suffs in affix:
+            if n-size>=3 and word[end-size:end] in suffs:
+                return end-size
+        return end
+    
+    
+    def pref_tied_span(self,word,start,end,affix_pref, affix_suff):
+        """
+        pref_tied() on word[start:end]: return the start of the rest of the word
+        """
+        n=end-start
+        for suff_size,suffs in affix_suff:
+            if n-suff_size>=3 and word[end-suff_size:end] in suffs:
+                for pref_size,prefs in affix_pref:
+                    if n-suff_size-pref_size>=3 and word[start:start+pref_size] in prefs:
+                        return start+pref_size
+        return start
+    
+    
+    def negation_span(self,word,start,end):
+        """
+        negation() on word[start:end]: return the (start, end) of the rest of the word
+        """
+        n=end-start
+        for pref_size,prefs in self.neg_prefs:
+            if n-pref_size>=4 and word[start:start+pref_size] in prefs:
+                for suff_size,suffs in self.neg_suffs:
+                    if word[end-suff_size:end] in suffs:
+                        start=self.pref_span(word,start+pref_size,end-suff_size,self.di_verb_prefs)
+                        end=self.suff_span(word,start,end-suff_size,self.full_suffs)
+                        return start,end
+        return start,end
+    
+    
+    def post(self,word):
+        for suff in self.post_suf1:
+            if len(word)-len(suff)>=3:
+                if word.endswith(suff):
+                    return word[:-len(suff)]
+        return word    
+
+                    
+    def stem_di(self,word):
+        """
+        stem the word according to the Morroccan Arabic option of Samad
+        """
+        cache=self.stem_di_cache
+        if cache is None:
+            return self._stem_di(word)
+        stem=cache.get(word)
+        if stem is None:
+            stem=self._stem_di(word)
+            cache.put(word,stem)
+        return stem
+    
+    
+    def _stem_di(self,word):
+        word=self.normalize(word)
+        noun=self.pref(word,self.di_noun_prefs)
+        
+        if len(noun)<len(word):
+            noun=self.suff(noun,self.di_noun_suffs)
+            return noun
+        
+        else:
+            verb=self.pref(word,self.di_verb_prefs)
+            if len(verb)<len(word):
+                verb=self.suff(verb,self.di_verb_suffs)
+                return verb
+    
+            else:
+                verb2=self.pref_tied(word,self.verb_prefs,self.verb_suffs)
+                if len(verb2)<len(word):
+                    verb2=self.suff(verb2,self.di_verb_suffs)
+                    return verb2
+                
+                else:
+                    verb_neg=self.negation(word)
+                    if len(verb_neg)<len(word):
+                        if len(verb_neg)<len(verb):
+                            return self.di_neg_pre2[1]+verb_neg
+                        
+                    else:
+                        noun2=self.pref_tied(word,self.noun_joined_prefs,self.noun_suffs)
+                        if len(noun2) < len(word):
+                            noun2=self.suff(noun2,self.di_noun_suffs)
+                            return noun2
+                        
+                        else:
+                            word=self.pref(word,self.full_prefs)
+                            word=self.suff(word,self.full_suffs)
+                            return word
+ 
+
+    def stem(self,word):
+        
+        """
+      stem the word  according to the standard Arabic option of Samad
+        """
+        cache=self.stem_cache
+        if cache is None:
+            return self._stem(word)
+        stem=cache.get(word)
+        if stem is None:
+            stem=self._stem(word)
+            cache.put(word,stem)
+        return stem
+    
+    
+    def _stem(self,word):
+        word=self.normalize(word)
+        noun=self.pref(word,self.noun_prefs)
+        
+        if len(noun)<len(word):
+            noun=self.suff(noun,self.noun_suffs)
+            return noun
+        
+        else:
+
+            verb2=self.pref_tied(word,self.verb_prefs,self.verb_suffs)
+            if len(verb2)<len(word):
+                verb2=self.suff(verb2,self.verb_suffs)
+                return verb2
+    
+            else:
+                noun2=self.pref_tied(word,self.noun_joined_prefs,self.noun_suffs)
+                if len(noun2) < len(word):
+                    noun2=self.suff(noun2,self.noun_suffs)
+                    return noun2
+                    
+                else:
+                    word=self.pref(word,self.noun_joined_prefs)
+                    word=self.suff(word,self.standard_suffs)
+                    return word
+
+    
+    def analyze(self,word):
+        """
+        analyze the word according to the standard Arabic option of Samad:
+        same stem as stem(), given as offsets in the normalized word
+        """
+        word=self.normalize(word)
+        n=len(word)
+        start=self.pref_span(word,0,n,self.noun_prefs)
+        if start:
+            return Analysis(word,start,self.suff_span(word,start,n,self.noun_suffs),"noun")
+        
+        start=self.pref_tied_span(word,0,n,self.verb_prefs,self.verb_suffs)
+        if start:
+            return Analysis(word,start,self.suff_span(word,start,n,self.verb_suffs),"tied_verb")
+        
+        start=self.pref_tied_span(word,0,n,self.noun_joined_prefs,self.noun_suffs)
+        if start:
+            return Analysis(word,start,self.suff_span(word,start,n,self.noun_suffs),"tied_noun")
+        
+        start=self.pref_span(word,0,n,self.noun_joined_prefs)
+        return Analysis(word,start,self.suff_span(word,start,n,self.standard_suffs),"fallback")
+    
+    
+    def analyze_di(self,word):
+        """
+        analyze the word according to the Moroccan Arabic option of Samad:
+        same stem as stem_di(), given as offsets in the normalized word
+        """
+        word=self.normalize(word)
+        n=len(word)
+        start=self.pref_span(word,0,n,self.di_noun_prefs)
+        if start:
+            return Analysis(word,start,self.suff_span(word,start,n,self.di_noun_suffs),"di_noun")
+        
+        start=self.pref_span(word,0,n,self.di_verb_prefs)
+        if start:
+            return Analysis(word,start,self.suff_span(word,start,n,self.di_verb_suffs),"di_verb")
+        
+        start=self.pref_tied_span(word,0,n,self.verb_prefs,self.verb_suffs)
+        if start:
+            return Analysis(word,start,self.suff_span(word,start,n,self.di_verb_suffs),"tied_verb")
+        
+        start,end=self.negation_span(word,0,n)
+        if end-start<n:
+            return Analysis(word,start,end,"negation",self.di_neg_pre2[1])
+        
+        start=self.pref_tied_span(word,0,n,self.noun_joined_prefs,self.noun_suffs)
+        if start:
+            return Analysis(word,start,self.suff_span(word,start,n,self.di_noun_suffs),"tied_noun")
+        
+        start=self.pref_span(word,0,n,self.full_prefs)
+        return Analysis(word,start,self.suff_span(word,start,n,self.full_suffs),"fallback")
+    
+    
+    def analyze_many(self,words):
+        """
+        analyze() a list or an iterable of words, each distinct word is analyzed once
+        """
+        return self.unique_map(self.analyze,words)
+    
+    
+    def analyze_di_many(self,words):
+        """
+        analyze_di() a list or an iterable of words, each distinct word is analyzed once
+        """
+        return self.unique_map(self.analyze_di,words)
+    
+    
+    def span_arrays(self,words,mode="stem"):
+        """
+        analyze the words with the mode ("stem" or "stem_di") into parallel arrays:
+        stem starts and ends ("I") and indexes of the branches in Samad.branches[mode] ("B")
+        """
+        check_mode(mode)
+        codes={branch:code for code,branch in enumerate(self.branches[mode])}
+        starts=array("I")
+        ends=array("I")
+        branches=array("B")
+        for analysis in getattr(self,mode.replace("stem","analyze")+"_many")(words):
+            starts.append(analysis.start)
+            ends.append(analysis.end)
+            branches.append(codes[analysis.branch])
+        return starts,ends,branches
+    
+    
+    def stem_many(self,words):
+        """
+        stem a list or an iterable of words according to the standard Arabic option, 
+        each distinct word is stemmed once 
+        """
+        return self.unique_map(self.stem,words)
+    
+    
+    def stem_di_many(self,words):
+        """
+        stem a list or an iterable of words according to the Moroccan Arabic option, 
+        each distinct word is stemmed once 
+        """
+        return self.unique_map(self.stem_di,words)
+    
+    
+    def iter_stem(self,words,chunk_size=4096):
+        """
+        lazily stem a stream of words according to the standard Arabic option
+        """
+        return self.iter_unique_map(self.stem,words,chunk_size)
+    
+    
+    def iter_stem_di(self,words,chunk_size=4096):
+        """
+        lazily stem a stream of words according to the Moroccan Arabic option
+        """
+        return self.iter_unique_map(self.stem_di,words,chunk_size)
+    
+    
+    @staticmethod
+    def unique_map(stem,words):
+        """
+        apply stem to the distinct words and scatter the stems back in input order
+        """
+        if not isinstance(words,list):
+            words=list(words)
+        stems=dict.fromkeys(words)
+        for word in stems:
+            stems[word]=stem(word)
+        return list(map(stems.__getitem__,words))
+    
+    
+    @staticmethod
+    def iter_unique_map(stem,words,chunk_size):
+        words=iter(words)
+        while True:
+            chunk=list(islice(words,chunk_size))
+            if not chunk:
+                return
+            yield from Samad.unique_map(stem,chunk)
+
+
+class AffixPattern:
+    """
+    Affix table compiled into anchored alternations, longest affixes first,
+    that only match when at least three letters are left for the stem
+    """
+    
+    def __init__(self,table):
+        affixes=[affix for size,affixes in table for affix in sorted(affixes)]
+        # an empty table never matches, an empty alternation would match everywhere
+        prefixes="|".join(map(re.escape,affixes)) or "(?!)"
+        self.prefix=re.compile("(?:%s)(?=.{3})" % prefixes,re.S)
+        # suffixes are matched as prefixes of the reversed word
+        suffixes="|".join(re.escape(affix[::-1]) for affix in affixes) or "(?!)"
+        self.suffix=re.compile("(?:%s)(?=.{3})" % suffixes,re.S)
+        # one alternation per length, tried in turn by pref_tied
+        self.lengths=tuple((size,re.compile("|".join(map(re.escape,sorted(affixes)))))
+                           for size,affixes in table)
+        
+
+class RegexSamad(Samad):
+    """
+SAMAD stemmer matching every affix table with one compiled regular expression 
+instead of length-indexed sets; it returns the same stems as Samad.
+
+    """
+    
+    engine="regex"
+    
+    def compile_tables(self):
+        tables=Samad.compile_tables(self)
+        return {name:AffixPattern(table) for name,table in tables.items()}
+    
+    
+    def pref(self,word,affix):
+        """
+        remove the longest prefix matched by the affix pattern 
+        """
+        match=affix.prefix.match(word)
+        return word[match.end():] if match else word
+    
+    
+    def suff(self,word,affix):
+        """
+        remove the longest suffix matched by the affix pattern 
+        """
+        match=affix.suffix.match(word[::-1])
+        return word[:-match.end()] if match else word
+    
+    
+    def pref_tied(self,word,affix_pref, affix_suff):
+        """
+        remove the prefix from the word depending on the suffix
+        """
+        n=len(word)
+        for size,suffs in affix_suff.lengths:
+            # the prefix pattern only sees the word without the suffix
+            if n-size>=4 and suffs.fullmatch(word,n-size):
+                match=affix_pref.prefix.match(word,0,n-size)
+                if match:
+                    return word[match.end():]
+        return word
+    
+    
+    def negation(self,word):
+        """
+        remove negation prefix and suffix 
+        remove verb prefix and suffix
+        """
+        suffix=self.neg_suffs.suffix.match(word[::-1])
+        if suffix:
+            # a single letter is reserved for the negation suffix,
+            # whatever its actual length 
+            prefix=self.neg_prefs.prefix.match(word,0,len(word)-1)
+            if prefix:
+                word=word[prefix.end():-suffix.end()]
+                word=self.pref(word,self.di_verb_prefs)
+                word=self.suff(word,self.full_suffs)
+        return word
+    
+    
+    def pref_span(self,word,start,end,affix):
+        match=affix.prefix.match(word,start,end)
+        return match.end() if match else start
+    
+    
+    def suff_span(self,word,start,end,affix):
+        n=len(word)
+        match=affix.suffix.match(word[::-1],n-end,n-start)
+        return n-match.end() if match else end
+    
+    
+    def pref_tied_span(self,word,start,end,affix_pref, affix_suff):
+        for size,suffs in affix_suff.lengths:
+            if end-start-size>=4 and suffs.fullmatch(word,end-size,end):
+                match=affix_pref.prefix.match(word,start,end-size)
+                if match:
+                    return match.end()
+        return start
+    
+    
+    def negation_span(self,word,start,end):
+        n=len(word)
+        suffix=self.neg_suffs.suffix.match(word[::-1],n-end,n-start)
+        if suffix:
+            prefix=self.neg_prefs.prefix.match(word,start,end-1)
+            if prefix:
+                start=self.pref_span(word,prefix.end(),n-suffix.end(),self.di_verb_prefs)
+                end=self.suff_span(word,start,n-suffix.end(),self.full_suffs)
+        return start,end
+        
+
+Samad.engines.update(index=Samad,regex=RegexSamad)
@@ -0,0 +1,69 @@
+
+# analyze() and analyze_di() repeat the cascades of stem() and stem_di() on
+# offsets: they must give the same stems on every word, for both engines
+
+import random
+from collections import Counter
+
+import pytest
+
+from SAMAD_Bench import generate_corpus
+from SAMAD_Stemmer import Samad
+
+
+def words():
+    """
+    corpus words, which go through every branch, and random words of any
+    Arabic letters (hamza forms and alef maqsura included) and lengths
+    """
+    rng=random.Random(1)
+    letters=[chr(code) for code in range(0x0621,0x064B)]
+    corpus=generate_corpus(50000,10000,1)
+    return sorted(set(corpus))+["".join(rng.choice(letters) for _ in range(rng.randint(1,10)))
+                                for _ in range(20000)]
+
+
+WORDS=words()
+
+
+@pytest.mark.parametrize("engine",sorted(Samad.engines))
+def test_analyze(engine):
+    samad=Samad(0,engine)
+    assert [word for word in WORDS if samad.analyze(word).stem!=samad.stem(word)]==[]
+
+
+@pytest.mark.parametrize("engine",sorted(Samad.engines))
+def test_analyze_di(engine):
+    samad=Samad(0,engine)
+    assert [word for word in WORDS if samad.analyze_di(word).stem!=samad.stem_di(word)]==[]
+
+
+@pytest.mark.parametrize("engine",sorted(Samad.engines))
+def test_span_arrays(engine):
+    samad=Samad(0,engine)
+    for mode in ("stem","stem_di"):
+        starts,ends,branches=samad.span_arrays(WORDS[:2000],mode)
+        analyses=getattr(samad,mode.replace("stem","analyze")+"_many")(WORDS[:2000])
+        assert list(starts)==[analysis.start for analysis in analyses]
+        assert list(ends)==[analysis.end for analysis in analyses]
+        assert [samad.branches[mode][code] for code in branches]==[analysis.branch for analysis in analyses]
+
+
+@pytest.mark.parametrize("engine",sorted(Samad.engines))
+def test_stats(engine):
+    # enable_stats() counts the exit of every word at the branch that analyze() reports
+    samad=Samad(0,engine)
+    samad.enable_stats()
+    assert "_stem" in vars(samad)
+    for word in WORDS[:5000]:
+        samad.stem(word)
+        samad.stem_di(word)
+    exits=samad.stats()["exits"]
+    samad.reset_stats()
+    assert sum(samad.stats()["exits"]["stem"].values())==0
+    samad.disable_stats()
+    # the plain methods of the class are back
+    assert "_stem" not in vars(samad) and samad.stats() is None
+    for mode in ("stem","stem_di"):
+        branches=Counter(analysis.branch for analysis in getattr(samad,mode.replace("stem","analyze")+"_many")(WORDS[:5000]))
+        assert exits[mode]=={branch:branches[branch] for branch in samad.branches[mode]}
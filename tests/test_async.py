@@ -0,0 +1,108 @@
+
+# astem_many() and astream() give the stems of stem_di_many() in input
+# order, from sync and async iterables, on thread and process executors,
+# with at most max_pending chunks in flight
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from SAMAD_Async import astem_many, astream
+from SAMAD_Bench import generate_corpus
+from SAMAD_Stemmer import Samad
+
+
+WORDS=generate_corpus(3000,500,2)
+DOCUMENTS=[" ".join(WORDS[i:i+7])+" hello 12" for i in range(0,len(WORDS),7)]
+
+
+async def aiterate(items):
+    for item in items:
+        yield item
+        await asyncio.sleep(0)
+
+
+@pytest.fixture(params=["threads","processes"])
+def executor(request):
+    executor=ThreadPoolExecutor(4) if request.param=="threads" else ProcessPoolExecutor(2)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("source",[list,iter,aiterate])
+def test_astem_many(executor,source):
+    stems=asyncio.run(astem_many(source(WORDS),"stem_di",executor,chunk_size=100,max_pending=3))
+    assert stems==Samad().stem_di_many(WORDS)
+
+
+@pytest.mark.parametrize("source",[list,iter,aiterate])
+def test_astream(executor,source):
+    async def collect():
+        return [stems async for stems in astream(source(DOCUMENTS),"stem",executor,chunk_size=10)]
+    samad=Samad()
+    assert asyncio.run(collect())==[samad.stem_many(samad.tokenize(document)) for document in DOCUMENTS]
+
+
+def test_word_lists():
+    async def collect():
+        return [stems async for stems in astream([["والكتاب","الكتب"],[],["ماكنعرفش"]])]
+    assert asyncio.run(collect())==[Samad().stem_di_many(["والكتاب","الكتب"]),[],[Samad().stem_di("ماكنعرفش")]]
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """
+    thread pool recording the largest number of chunks in flight
+    """
+
+    def __init__(self,workers):
+        super().__init__(workers)
+        self.lock=threading.Lock()
+        self.in_flight=0
+        self.max_in_flight=0
+
+    def submit(self,function,*args):
+        with self.lock:
+            self.in_flight+=1
+            self.max_in_flight=max(self.max_in_flight,self.in_flight)
+        future=super().submit(function,*args)
+        future.add_done_callback(self.done)
+        return future
+
+    def done(self,future):
+        with self.lock:
+            self.in_flight-=1
+
+
+@pytest.mark.parametrize("max_pending",[1,3])
+def test_max_pending(max_pending):
+    chunk_size=10
+    read=0
+    def documents():
+        nonlocal read
+        for document in DOCUMENTS:
+            read+=1
+            yield document
+    async def collect():
+        stemmed=[]
+        async for stems in astream(documents(),"stem_di",executor,chunk_size,max_pending):
+            # the source is read at most max_pending chunks ahead of the output
+            assert read-len(stemmed)<=max_pending*chunk_size
+            stemmed.append(stems)
+            # a slow consumer lets the executor run ahead as far as it can
+            await asyncio.sleep(0.001)
+        return stemmed
+    executor=CountingExecutor(8)
+    try:
+        assert len(asyncio.run(collect()))==len(DOCUMENTS)
+    finally:
+        executor.shutdown()
+    assert executor.max_in_flight<=max_pending
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        asyncio.run(astem_many(WORDS,max_pending=0))
+    with pytest.raises(ValueError):
+        asyncio.run(astem_many(WORDS,"stemmer"))
@@ -0,0 +1,59 @@
+
+# the command line stems the lines of files or of the standard input,
+# with one or several jobs, like Samad.stem_text() and stem_di_text()
+
+import io
+import sys
+
+import pytest
+
+from SAMAD_CLI import main
+from SAMAD_Stemmer import Samad
+
+
+LINES=["ماكنعرفش هاد الكتاب، hello 12","كَتَبَ الكتـــاب (والكتب)","","كنقراو الكتب 😀"]*200
+TEXT="\n".join(LINES)+"\n"
+
+
+def expected(mode):
+    samad=Samad()
+    return "".join(getattr(samad,mode+"_text")(line)+"\n" for line in LINES)
+
+
+@pytest.fixture
+def path(tmp_path):
+    path=tmp_path/"posts.txt"
+    path.write_text(TEXT,encoding="utf-8")
+    return str(path)
+
+
+def run(capsysbinary,argv):
+    assert main(argv)==0
+    return capsysbinary.readouterr().out.decode("utf-8")
+
+
+@pytest.mark.parametrize("mode",["stem","stem_di"])
+def test_modes(capsysbinary,path,mode):
+    assert run(capsysbinary,["--mode",mode,path])==expected(mode)
+
+
+def test_jobs(capsysbinary,path):
+    assert run(capsysbinary,["-m","stem_di","-j","2","--block-size","500",path])==expected("stem_di")
+
+
+@pytest.mark.parametrize("argv",[[],["-"]])
+def test_stdin(capsysbinary,monkeypatch,argv):
+    monkeypatch.setattr(sys,"stdin",io.TextIOWrapper(io.BytesIO(TEXT.encode("utf-8"))))
+    assert run(capsysbinary,argv+["--block-size","100"])==expected("stem")
+
+
+def test_output(tmp_path,path):
+    output=tmp_path/"stems.txt"
+    assert main(["-o",str(output),path])==0
+    assert output.read_text(encoding="utf-8")==expected("stem")
+
+
+@pytest.mark.parametrize("option",["--jobs","--block-size"])
+def test_negative(path,option):
+    with pytest.raises(SystemExit,match=option):
+        main([option,"-1",path])
@@ -0,0 +1,56 @@
+
+# stem_column() gives the stems of stem_many() and stem_di_many() for the
+# pandas Series of object, string and categorical dtypes and for chunked
+# Arrow arrays, with the missing values left missing
+
+import pytest
+
+from SAMAD_Columns import stem_column
+from SAMAD_Stemmer import Samad
+
+
+VALUES=["والكتاب",None,"ماكنعرفش","الكتب","والكتاب","كتاب hello",None,""]*3
+
+
+def expected(mode):
+    stem_many=getattr(Samad(),mode+"_many")
+    stems=stem_many([value for value in VALUES if value is not None])
+    stems.reverse()
+    return [None if value is None else stems.pop() for value in VALUES]
+
+
+@pytest.mark.parametrize("mode",["stem","stem_di"])
+@pytest.mark.parametrize("dtype",["object","string","string[pyarrow]","category"])
+def test_series(mode,dtype):
+    pandas=pytest.importorskip("pandas")
+    if dtype=="string[pyarrow]":
+        pytest.importorskip("pyarrow")
+    series=pandas.Series(VALUES,index=range(100,100+len(VALUES)),name="text",dtype=dtype)
+    stems=stem_column(series,mode)
+    assert stems.name=="text" and list(stems.index)==list(series.index)
+    assert stems.dtype==(series.dtype if dtype.startswith("string") else object)
+    assert [None if pandas.isna(stem) else stem for stem in stems]==expected(mode)
+
+
+@pytest.mark.parametrize("mode",["stem","stem_di"])
+@pytest.mark.parametrize("type_name",["string","large_string"])
+def test_arrow(mode,type_name):
+    pyarrow=pytest.importorskip("pyarrow")
+    array_type=getattr(pyarrow,type_name)()
+    chunks=[VALUES[:5],VALUES[5:],[]]
+    for column in (pyarrow.chunked_array(chunks,array_type),pyarrow.array(VALUES,array_type)):
+        stems=stem_column(column,mode)
+        assert type(stems) is type(column) and stems.type==array_type
+        assert stems.to_pylist()==expected(mode)
+        assert stems.null_count==column.null_count
+    assert [len(chunk) for chunk in stem_column(pyarrow.chunked_array(chunks,array_type),mode).chunks]==[5,len(VALUES)-5,0]
+
+
+def test_invalid():
+    with pytest.raises(TypeError):
+        stem_column(VALUES)
+    pyarrow=pytest.importorskip("pyarrow")
+    with pytest.raises(TypeError):
+        stem_column(pyarrow.array([1,2]))
+    with pytest.raises(ValueError):
+        stem_column(pyarrow.array(VALUES),"stemmer")
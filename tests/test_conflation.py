@@ -0,0 +1,30 @@
+
+from SAMAD_Conflation import ConflationTable, collect_conflations
+
+
+TEXTS=["والكتاب الكتاب والكتاب","كتابي والكتاب","بالكتاب وكتابك الكتاب"]*400
+
+
+def test_max_forms():
+    table=ConflationTable("stem",max_forms=2)
+    table.add_texts(TEXTS)
+    for stem,total,forms in table.items():
+        assert len(forms)<=2
+        assert sum(forms.values())<=total
+    assert list(table.forms("كتاب"))==["والكتاب","الكتاب"]
+
+
+def test_workers_agree():
+    tables=[collect_conflations(TEXTS,"stem",max_forms=1,workers=workers,chunk_size=50)
+            for workers in (1,2)]
+    # the counts of the kept forms are lower bounds that depend on the chunks
+    assert list(tables[0].forms("كتاب"))==list(tables[1].forms("كتاب"))==["والكتاب"]
+    assert tables[0].total("كتاب")==tables[1].total("كتاب")
+
+
+def test_save_keeps_max_forms(tmp_path):
+    table=ConflationTable("stem",max_forms=1)
+    table.add_texts(TEXTS)
+    table.save(str(tmp_path/"conflations.jsonl"))
+    loaded=ConflationTable.load(str(tmp_path/"conflations.jsonl"))
+    assert loaded.forms("كتاب")==table.forms("كتاب")=={"والكتاب":1200}
@@ -0,0 +1,70 @@
+
+# NearDuplicateDetector finds the posts that repeat an earlier one with a
+# few words changed, and not the unrelated posts; its results must not
+# depend on the size of the NumPy batches
+
+import pytest
+
+numpy=pytest.importorskip("numpy")
+
+from SAMAD_Bench import generate_corpus
+from SAMAD_Dedup import NearDuplicateDetector, find_duplicates
+
+
+def posts(count,length=40,seed=0):
+    words=generate_corpus(count*length,20000,seed)
+    return [" ".join(words[i:i+length]) for i in range(0,count*length,length)]
+
+
+ORIGINALS=posts(60)
+
+
+def variant(text):
+    """
+    the text with a conjunction on its first word and one word dropped
+    """
+    words=text.split()
+    return " ".join(["و"+words[0]]+words[1:20]+words[21:])
+
+
+def stream():
+    # originals first, then a variant of every third original and unrelated posts
+    return ORIGINALS+[variant(text) for text in ORIGINALS[::3]]+posts(20,seed=1)
+
+
+def test_duplicates():
+    found={index:(earlier,bands) for index,earlier,bands in find_duplicates(stream(),0.5)}
+    variants=range(len(ORIGINALS),len(ORIGINALS)+len(ORIGINALS[::3]))
+    assert {index:found[index][0] for index in variants if index in found}=={
+        index:3*(index-len(ORIGINALS)) for index in variants}
+    # the originals and the unrelated posts have no near duplicate
+    assert set(found)==set(variants)
+    assert all(bands>=1 for _,bands in found.values())
+
+
+def test_batch_size():
+    results=[list(find_duplicates(stream(),0.5,batch_size=batch_size))
+             for batch_size in (1,7,1024)]
+    assert results[0]==results[1]==results[2]
+    assert results[0]
+
+
+def test_short_texts():
+    detector=NearDuplicateDetector(0.5,ngram=3)
+    texts=["الكتاب","الكتاب الجديد","بالكتاب","hello",""]+ORIGINALS[:2]
+    shingles,counts=detector.shingle_hashes(texts)
+    # one shingle for the texts shorter than ngram, none without Arabic words
+    assert list(counts[:5])==[1,1,1,0,0]
+    # the shingles of a batch are those of its texts one at a time
+    alone=[detector.shingle_hashes([text])[0] for text in texts]
+    assert list(shingles)==list(numpy.concatenate(alone))
+    found=list(detector.add_many(enumerate(texts)))
+    assert [(index,earlier) for index,earlier,_ in found]==[(2,0)]
+
+
+def test_invalid():
+    with pytest.raises(ValueError,match="ngram"):
+        NearDuplicateDetector(ngram=0)
+    detector=NearDuplicateDetector()
+    with pytest.raises(ValueError,match="non-negative"):
+        list(detector.add_many([(0,ORIGINALS[0]),(-1,ORIGINALS[0])]))
@@ -0,0 +1,87 @@
+
+# labelled texts for the dialect score of stem_auto(): standard Arabic texts 
+# must stay under Samad.dialect_threshold, so that they are not over-stemmed
+# by the Moroccan Arabic option
+
+import pytest
+
+from SAMAD_Stemmer import Samad
+
+
+# Moroccan Arabic
+DARIJA=[
+    "واش نتا غادي تمشي للدار دابا",
+    "كانقولك بلي ماكنعرفش هاد الشي",
+    "الله يخليك عافاك عطيني شوية ديال الما",
+    "كنتي فين البارح ماجيتيش للخدمة",
+    "هاد الفيلم زوين بزاف وكايضحك",
+    "ماعندي حتى فلوس باش نشري الحوايج",
+    "غانمشي نشوف الماتش مع صحابي فالقهوة",
+    "تايقولو بلي الجو غادي يكون سخون غدا",
+    "علاش ماكتجاوبش على التيليفون ديالك",
+    "بغيت نعرف شحال كايسوا هاد الموبايل",
+    "راه ماكاين والو فالدار خاصني نمشي للسوق",
+    "كيفاش درتي باش نجحتي فالامتحان",
+    "الناس كايتسناو الطوبيس من الصباح",
+    "مابغيتش نخدم اليوم راني عيان",
+    "شكون لي قالك هاد الهضرة",
+    "كانبغيك بزاف ومانقدرش نعيش بلا بيك",
+    "واخا نتلاقاو من بعد فالقهوة ديال الحي",
+    "السيمانة الجاية غانسافرو لمراكش",
+    "هاد الحكومة ماكاتدير والو للشعب",
+    "تانشوف بلي المشكل فيك نتا ماشي فيا",
+    "الدراري كايلعبو الكورة فالزنقة",
+    "ختي كاتقرا فالجامعة ديال الرباط",
+    "ماتنساش تجيب معاك الخبز ملي تجي",
+    "فين غاتدوز العطلة هاد العام",
+    "هادشي لي كان عندي نقولو ليك",
+]
+
+# standard Arabic, with words that start like Moroccan verbs
+MSA=[
+    "كتابة عنوان الكتاب تتحدث عن التنمية",
+    "تتناول الدراسة عناصر التنمية الاقتصادية",
+    "أعلنت الحكومة عن خطة جديدة لتطوير التعليم",
+    "يتناول المؤتمر قضايا البيئة والتغير المناخي",
+    "تتمثل أهمية البحث في تحليل البيانات الاجتماعية",
+    "كانت الكاتبة تتحدث عن تجربتها في الغربة",
+    "تناقش اللجنة تقارير المنظمات الدولية",
+    "تسعى الدولة إلى تحقيق التنمية المستدامة",
+    "عن طريق التعاون يمكن تجاوز الأزمات",
+    "تتواصل الاحتجاجات في عدة مدن عربية",
+    "نشرت الصحيفة مقالا عن تاريخ المدينة القديمة",
+    "كان الكاتبون يناقشون مستقبل الأدب العربي",
+    "تنظم الجامعة ندوة حول الذكاء الاصطناعي",
+    "يعاني الاقتصاد من ارتفاع معدلات التضخم",
+    "تقدم المكتبة خدمات متنوعة للباحثين والطلاب",
+    "تتطلب هذه المرحلة جهودا كبيرة من الجميع",
+    "عنيت الوزارة بتحسين جودة الخدمات الصحية",
+    "غادر الرئيس البلاد متوجها إلى العاصمة",
+    "تناولت الندوة موضوع الهجرة غير الشرعية",
+    "كانت النتائج مشجعة بالنسبة للفريق الوطني",
+    "زار الوفد تايوان وتايلاند في جولة آسيوية",
+    "كائنات حية تعيش في أعماق البحار",
+    "كاتبون كثيرون شاركوا في معرض الكتاب",
+    "تعتمد الشركات على تقنيات حديثة في الإنتاج",
+    "انتخب البرلمان رئيسا جديدا للجنة المالية",
+]
+
+
+@pytest.fixture(scope="module")
+def samad():
+    return Samad()
+
+
+def test_standard_texts(samad):
+    scores={text:samad.dialect_score(samad.tokenize(text)) for text in MSA}
+    assert {text:score for text,score in scores.items() if score>=samad.dialect_threshold}=={}
+
+
+def test_moroccan_texts(samad):
+    missed=[text for text in DARIJA if samad.dialect_score(samad.tokenize(text))<samad.dialect_threshold]
+    assert len(missed)<=len(DARIJA)//10
+
+
+def test_standard_routing(samad):
+    for text in MSA:
+        assert samad.stem_auto(text)==samad.stem_text(text)
@@ -0,0 +1,46 @@
+
+import pytest
+
+from SAMAD_Dictionary import DictionaryStemmer, StemDictionary, build_dictionary, main
+from SAMAD_Stemmer import Samad
+
+
+WORDS=["ماكنعرفش","والكتاب","كنقولو","الكتب","كتب"]
+
+
+@pytest.fixture
+def dictionaries(tmp_path):
+    paths={mode:str(tmp_path/(mode+".dic")) for mode in ("stem","stem_di")}
+    for mode,path in paths.items():
+        build_dictionary(WORDS,path,mode)
+    return paths
+
+
+def test_lookup(dictionaries):
+    samad=Samad()
+    stemmer=DictionaryStemmer(dictionaries["stem"],dictionaries["stem_di"])
+    assert stemmer.stem_many(WORDS+["كتابي"])==samad.stem_many(WORDS+["كتابي"])
+    assert stemmer.stem_di_many(WORDS+["كتابي"])==samad.stem_di_many(WORDS+["كتابي"])
+    with StemDictionary(dictionaries["stem_di"]) as dictionary:
+        assert (len(dictionary),dictionary.mode)==(len(WORDS),"stem_di")
+        assert dictionary.get("غير") is None
+    stemmer.close()
+
+
+def test_wrong_mode(dictionaries):
+    with pytest.raises(ValueError,match="mode"):
+        DictionaryStemmer(stem_di=dictionaries["stem"])
+
+
+def test_other_affixes(dictionaries):
+    Other=type("Other",(Samad,),{"di_neg_suf1":("ش",)})
+    with pytest.raises(ValueError,match="affix"):
+        DictionaryStemmer(stem_di=dictionaries["stem_di"],samad=Other())
+
+
+def test_default_mode(tmp_path):
+    vocabulary=tmp_path/"words.txt"
+    vocabulary.write_text("\n".join(WORDS),encoding="utf-8")
+    main(["build","-o",str(tmp_path/"vocab.dic"),str(vocabulary)])
+    with StemDictionary(str(tmp_path/"vocab.dic")) as dictionary:
+        assert dictionary.mode=="stem_di"
@@ -0,0 +1,51 @@
+
+# data/golden.tsv holds the stems of the distinct words of the default
+# benchmark corpus (SAMAD_Bench.py, seed 0), written by write_golden() with
+# the stemmer of the first release of SAMAD_Stemmer.py
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import SAMAD_Profiles
+from SAMAD_Bench import check_golden
+from SAMAD_Stemmer import Samad
+
+
+GOLDEN=os.path.join(os.path.dirname(__file__),"data","golden.tsv")
+
+
+def analyzer(samad):
+    """
+    stem and stem_di of the stems returned by analyze() and analyze_di()
+    """
+    return SimpleNamespace(stem=lambda word: samad.analyze(word).stem,
+                           stem_di=lambda word: samad.analyze_di(word).stem)
+
+
+@pytest.mark.parametrize("engine",sorted(Samad.engines))
+def test_stems(engine):
+    assert check_golden(GOLDEN,Samad(0,engine))==[]
+
+
+@pytest.mark.parametrize("engine",sorted(Samad.engines))
+def test_cached_stems(engine):
+    samad=Samad(64,engine)
+    assert check_golden(GOLDEN,samad)==[]
+    assert check_golden(GOLDEN,samad)==[]
+
+
+@pytest.mark.parametrize("engine",sorted(Samad.engines))
+def test_analyze(engine):
+    assert check_golden(GOLDEN,analyzer(Samad(0,engine)))==[]
+
+
+@pytest.mark.parametrize("engine",sorted(Samad.engines))
+def test_profile(engine,tmp_path,monkeypatch):
+    monkeypatch.setattr(SAMAD_Profiles,"CACHE_DIR",str(tmp_path))
+    stemmer=SAMAD_Profiles.profile_stemmer("moroccan",engine)
+    assert check_golden(GOLDEN,stemmer(0))==[]
+    # the second stemmer reads the tables compiled by the first one
+    assert os.listdir(tmp_path)
+    assert check_golden(GOLDEN,SAMAD_Profiles.profile_stemmer("moroccan",engine)(0))==[]
@@ -0,0 +1,53 @@
+
+# saved indexes, vocabularies and tables are checked against the affix
+# inventories of the stemmer that reads them
+
+import pickle
+
+import pytest
+
+from SAMAD_Encoder import StemEncoder
+from SAMAD_Index import StemIndex
+from SAMAD_Stemmer import RegexSamad, Samad
+
+
+DOCUMENTS=[(1,"ماكنعرفش هاد الكتاب"),(2,"كنقراو الكتب"),(3,"والكتاب الجديد")]
+
+
+def test_index_across_engines(tmp_path):
+    path=str(tmp_path/"posts.idx")
+    index=StemIndex("stem_di",Samad(engine="regex"))
+    index.add_many(DOCUMENTS)
+    index.save(path)
+    loaded=StemIndex.load(path,Samad())
+    assert loaded.postings==index.postings
+    assert loaded.query("الكتاب")==index.query("الكتاب")
+
+
+def test_index_other_affixes(tmp_path):
+    path=str(tmp_path/"posts.idx")
+    StemIndex("stem_di").save(path)
+    Other=type("Other",(Samad,),{"di_neg_suf1":("ش",)})
+    with pytest.raises(ValueError):
+        StemIndex.load(path,Other())
+
+
+def test_encoder_across_engines(tmp_path):
+    path=str(tmp_path/"vocabulary.json")
+    encoder=StemEncoder("stem_di",samad=Samad(engine="regex"))
+    ids=encoder.encode("ماكنعرفش هاد الكتاب")
+    encoder.freeze()
+    encoder.save(path)
+    loaded=StemEncoder.load(path,Samad())
+    assert loaded.encode("ماكنعرفش هاد الكتاب")==ids
+
+
+@pytest.mark.parametrize("cls",[Samad,RegexSamad])
+def test_tables_keep_the_engine(cls,tmp_path):
+    path=str(tmp_path/"tables.pickle")
+    cls.save_tables(path)
+    assert cls.load_tables(path)
+    other=RegexSamad if cls is Samad else Samad
+    assert not other.load_tables(path)
+    with open(path,"rb") as f:
+        assert pickle.load(f)[0]==(cls.engine,cls.fingerprint())
@@ -0,0 +1,55 @@
+
+# JSON lines are split on "\n" only: the line breaks that JSON strings may
+# hold (U+2028, U+2029, U+0085) stay inside their record; malformed lines,
+# CSV headers that differ and negative options stop the command line with
+# an error, and the standard input is left open
+
+import io
+import json
+import sys
+
+import pytest
+
+from SAMAD_Records import main, stem_csv_stream, stem_jsonl
+from SAMAD_Stemmer import Samad
+
+
+def test_unicode_line_breaks():
+    samad=Samad()
+    words=["والكتاب","كتابي","بالكتاب","الكتاب"]
+    block='{"text": "%s\u2028%s\u2029%s\u0085%s"}\r\n{"text": "ماكنعرفش"}\n' % tuple(words)
+    lines=stem_jsonl(samad,"stem_di",block,["text"],"_stem",tokens=True).split("\n")
+    assert len(lines)==3 and lines[2]==""
+    assert json.loads(lines[0])["text_stem"]==samad.stem_di_many(words)
+    assert json.loads(lines[1])["text_stem"]==[samad.stem_di("ماكنعرفش")]
+
+
+def test_malformed_line(tmp_path,capsysbinary):
+    path=tmp_path/"posts.jsonl"
+    path.write_text('{"text": "الكتاب"}\n\n{"text": "الكتب"\n{"text": "كتاب"}\n',encoding="utf-8")
+    with pytest.raises(SystemExit,match="posts.jsonl:3: invalid JSON line"):
+        main(["--field","text","--block-size","10",str(path)])
+    # the blocks before the malformed line are written
+    assert capsysbinary.readouterr().out.decode("utf-8")=='{"text": "الكتاب", "text_stem": "كتاب"}\n'
+
+
+def test_csv_headers(tmp_path):
+    paths=[tmp_path/"a.csv",tmp_path/"b.csv",tmp_path/"c.csv"]
+    for path,header in zip(paths,["id,text","id,text","text,id"]):
+        path.write_text(header+"\n1,الكتاب\n",encoding="utf-8")
+    assert "".join(stem_csv_stream(paths[:2],["text"]))=="id,text,text_stem\n"+"1,الكتاب,كتاب\n"*2
+    with pytest.raises(SystemExit,match="c.csv:1: the CSV header differs from the header of .*a.csv"):
+        main(["--format","csv","--field","text"]+[str(path) for path in paths])
+
+
+def test_csv_stdin(monkeypatch):
+    stdin=io.TextIOWrapper(io.BytesIO("id,text\n1,والكتاب\n".encode("utf-8")))
+    monkeypatch.setattr(sys,"stdin",stdin)
+    assert "".join(stem_csv_stream(["-"],["text"],"stem_di"))=="id,text,text_stem\n1,والكتاب,كتاب\n"
+    assert not stdin.closed and stdin.read()==""
+
+
+@pytest.mark.parametrize("option",["--jobs","--block-size"])
+def test_negative(tmp_path,option):
+    with pytest.raises(SystemExit,match=option):
+        main(["--field","text",option,"-1",str(tmp_path/"posts.jsonl")])
@@ -0,0 +1,151 @@
+
+# round trips between StemClient and StemServer over the Unix socket and
+# over HTTP: each mode is routed to its option, and bad requests and
+# failed batches are answered with an error instead of a dropped connection
+
+import asyncio
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from SAMAD_Server import StemClient, StemServer
+from SAMAD_Stemmer import Samad
+
+
+WORDS=["ماكنعرفش","والكتاب","كنقراو","الكتب","والكتاب"]
+
+
+class Running:
+    """
+    StemServer serving in asyncio.run() in a background thread
+    """
+
+    def __init__(self,workers,serve):
+        self.server=StemServer(workers)
+        self.started=threading.Event()
+        self.thread=threading.Thread(target=asyncio.run,args=(self.serve(serve),))
+        self.thread.start()
+        self.started.wait()
+
+    async def serve(self,serve):
+        self.loop=asyncio.get_running_loop()
+        self.serving=asyncio.ensure_future(serve(self.server))
+        self.started.set()
+        try:
+            await self.serving
+        except asyncio.CancelledError:
+            pass
+
+    def close(self):
+        # asyncio.run() then cancels the connection handlers and closes the loop
+        self.loop.call_soon_threadsafe(self.serving.cancel)
+        self.thread.join()
+        self.server.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1",0))
+        return sock.getsockname()[1]
+
+
+def unix_connection(path):
+    sock=socket.socket(socket.AF_UNIX)
+    sock.connect(path)
+    return sock
+
+
+def wait_for(connect):
+    for _ in range(200):
+        try:
+            connect().close()
+            return
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError("the server did not start")
+
+
+@pytest.fixture(params=["unix","http"])
+def running(request,tmp_path):
+    if request.param=="unix":
+        path=str(tmp_path/"samad.sock")
+        running=Running(0,lambda server: server.serve_unix(path))
+        connect=lambda: unix_connection(path)
+        running.client=lambda: StemClient(path=path,timeout=10)
+    else:
+        port=free_port()
+        running=Running(0,lambda server: server.serve_http("127.0.0.1",port))
+        connect=lambda: socket.create_connection(("127.0.0.1",port))
+        running.client=lambda: StemClient(port=port,timeout=10)
+    wait_for(connect)
+    yield running
+    running.close()
+
+
+def test_modes(running):
+    samad=Samad()
+    with running.client() as client:
+        assert client.stem(WORDS)==samad.stem_many(WORDS)
+        assert client.stem_di(WORDS)==samad.stem_di_many(WORDS)
+        # the connection is kept and cached stems are served again
+        assert client.stem_di(WORDS)==samad.stem_di_many(WORDS)
+        assert client.stem([])==[]
+
+
+def test_bad_request(running):
+    with running.client() as client:
+        with pytest.raises(ValueError,match="list of strings"):
+            client.request("stem",[1,2])
+        with pytest.raises(ValueError):
+            client.request("stemmer",WORDS)
+        assert client.stem(WORDS[:1])==[Samad().stem(WORDS[0])]
+
+
+def test_failed_batch(running,monkeypatch):
+    async def broken(mode,words):
+        raise RuntimeError("worker died")
+    monkeypatch.setattr(running.server,"stem_missing",broken)
+    with running.client() as client:
+        with pytest.raises(ValueError,match="RuntimeError: worker died"):
+            client.stem(["كلمة"])
+        monkeypatch.undo()
+        assert client.stem(["كلمة"])==[Samad().stem("كلمة")]
+
+
+def test_http_status(tmp_path):
+    port=free_port()
+    running=Running(0,lambda server: server.serve_http("127.0.0.1",port))
+    try:
+        wait_for(lambda: socket.create_connection(("127.0.0.1",port)))
+        async def broken(mode,words):
+            raise RuntimeError("worker died")
+        connection=http.client.HTTPConnection("127.0.0.1",port,timeout=10)
+        for path,body,status in (("/stem_di",{"words":WORDS},200),("/other",{"words":WORDS},404),
+                                 ("/stem","{",400),("/stem",{"words":["كلمة"]},500)):
+            if status==500:
+                running.server.stem_missing=broken
+            connection.request("POST",path,body if isinstance(body,str) else json.dumps(body))
+            response=connection.getresponse()
+            assert response.status==status
+            reply=json.loads(response.read())
+            assert ("stems" in reply)==(status==200)
+        connection.close()
+    finally:
+        running.close()
+
+
+@pytest.mark.skipif(not hasattr(os,"fork"),reason="worker processes are forked")
+def test_workers(tmp_path):
+    path=str(tmp_path/"samad.sock")
+    running=Running(2,lambda server: server.serve_unix(path))
+    try:
+        wait_for(lambda: unix_connection(path))
+        with StemClient(path=path,timeout=30) as client:
+            assert client.stem_di(WORDS*3)==Samad().stem_di_many(WORDS*3)
+    finally:
+        running.close()
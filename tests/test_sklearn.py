@@ -0,0 +1,70 @@
+
+# StemTransformer stems like the stemmer, raises NotFittedError before
+# fit(), survives pickle and clone, and serves as the analyzer of a
+# CountVectorizer without refitting on the texts it transforms
+
+import pickle
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+from sklearn.base import clone
+from sklearn.exceptions import NotFittedError
+from sklearn.feature_extraction.text import CountVectorizer
+
+from SAMAD_Sklearn import StemTransformer
+from SAMAD_Stemmer import Samad
+
+
+TRAIN=["ماكنعرفش هاد الكتاب","كنقراو الكتب (والكتاب)"]
+TEXTS=["والكتاب الجديد، hello","بالكتب 12 ماكنعرفش"]
+
+
+def test_not_fitted():
+    transformer=StemTransformer()
+    for stem in (transformer.transform,lambda texts: transformer(texts[0])):
+        with pytest.raises(NotFittedError):
+            stem(TEXTS)
+
+
+@pytest.mark.parametrize("mode",["stem","stem_di"])
+def test_transform(mode):
+    samad=Samad()
+    transformer=StemTransformer(mode).fit(TRAIN)
+    assert transformer.transform(TEXTS)==[getattr(samad,mode+"_text")(text) for text in TEXTS]
+    tokens=StemTransformer(mode,tokens=True).fit(TRAIN).transform(TEXTS)
+    assert tokens==[getattr(samad,mode+"_many")(samad.tokenize(text)) for text in TEXTS]
+
+
+def test_no_refit():
+    transformer=StemTransformer().fit(TRAIN)
+    vocabulary=dict(transformer.vocabulary_)
+    transformer.transform(TEXTS)
+    transformer(TEXTS[0])
+    assert transformer.vocabulary_==vocabulary
+
+
+def test_pickle_and_clone():
+    transformer=StemTransformer("stem",tokens=True).fit(TRAIN)
+    transformer.transform(TEXTS)
+    copy=pickle.loads(pickle.dumps(transformer))
+    assert "_samad" not in vars(copy)
+    assert copy.vocabulary_==transformer.vocabulary_
+    assert copy.transform(TEXTS)==transformer.transform(TEXTS)
+    cloned=clone(transformer)
+    assert cloned.get_params()==transformer.get_params()
+    assert not hasattr(cloned,"vocabulary_")
+    with pytest.raises(NotFittedError):
+        cloned.transform(TEXTS)
+
+
+def test_analyzer():
+    samad=Samad()
+    vectorizer=CountVectorizer(analyzer=StemTransformer().fit(TRAIN))
+    counts=vectorizer.fit_transform(TRAIN+TEXTS)
+    stems=[samad.stem_di_many(samad.tokenize(text)) for text in TRAIN+TEXTS]
+    assert sorted(vectorizer.vocabulary_)==sorted({stem for words in stems for stem in words})
+    assert counts.sum()==sum(map(len,stems))
+    # the analyzer pickles with the vectorizer
+    assert (pickle.loads(pickle.dumps(vectorizer)).transform(TEXTS)!=vectorizer.transform(TEXTS)).nnz==0
@@ -0,0 +1,88 @@
+
+# the caches of the stemmer, and one stemmer shared by threads, with the
+# default caches and with the caches of thread_safe=True: no thread may
+# fail and the stems must be those of a stemmer used by one thread.
+# Without the GIL the caches are always the locked ones. stem_corpus()
+# and stem_texts() give the same stems on threads and on processes.
+
+import sys
+import threading
+
+import pytest
+
+from SAMAD_Bench import generate_corpus
+from SAMAD_Parallel import stem_corpus, stem_texts
+from SAMAD_Stemmer import Samad, SharedStemCache, StemCache
+
+
+WORDS=generate_corpus(20000,2000,1)
+
+
+@pytest.mark.parametrize("thread_safe",[False,True])
+def test_shared_stemmer(thread_safe):
+    samad=Samad(cache_size=64,thread_safe=thread_safe)
+    expected=[(stem,stem_di) for stem,stem_di in zip(Samad(0).stem_many(WORDS),Samad(0).stem_di_many(WORDS))]
+    errors=[]
+    results={}
+
+    def work(index):
+        try:
+            # each thread walks the words from another start, so that they
+            # read, insert and evict the same cached words at the same time
+            start=index*len(WORDS)//8
+            words=WORDS[start:]+WORDS[:start]
+            results[index]=([(samad.stem(word),samad.stem_di(word)) for word in words],start)
+        except Exception as error:
+            errors.append(error)
+
+    threads=[threading.Thread(target=work,args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors==[]
+    for stems,start in results.values():
+        assert stems==expected[start:]+expected[:start]
+    assert samad.cache_info()["stem"]["size"]<=64
+
+
+@pytest.mark.parametrize("gil",[True,False])
+def test_cache_without_gil(monkeypatch,gil):
+    # a free-threaded build running without the GIL always gets locked caches
+    monkeypatch.setattr(sys,"_is_gil_enabled",lambda: gil,raising=False)
+    assert isinstance(Samad(64).stem_cache,StemCache if gil else SharedStemCache)
+    assert isinstance(Samad(64,thread_safe=True).stem_cache,SharedStemCache)
+
+
+@pytest.mark.parametrize("thread_safe",[False,True])
+def test_cache_info(thread_safe):
+    words=["والكتاب","كتبو","والكتاب","ماكنعرفش","كتبو"]
+    samad=Samad(64,thread_safe=thread_safe)
+    for word in words:
+        samad.stem(word)
+    info=samad.cache_info()
+    assert (info["stem"]["hits"],info["stem"]["misses"],info["stem"]["evictions"],info["stem"]["size"])==(2,3,0,3)
+    assert info["stem_di"]["hits"]==info["stem_di"]["misses"]==info["stem_di"]["size"]==0
+    samad.cache_clear()
+    assert samad.cache_info()["stem"]["hits"]==samad.cache_info()["stem"]["size"]==0
+    assert Samad(0).cache_info()=={"stem":None,"stem_di":None}
+
+
+def test_cache_eviction():
+    # the least recently used word is evicted: كتبو, then والكتاب
+    samad=Samad(2)
+    for word in ["والكتاب","كتبو","والكتاب","ماكنعرفش","كتبو"]:
+        samad.stem(word)
+    info=samad.cache_info()["stem"]
+    assert (info["hits"],info["misses"],info["evictions"],info["size"])==(1,4,2,2)
+    assert list(samad.stem_cache.data)==["ماكنعرفش","كتبو"]
+
+@pytest.mark.parametrize("threads",[False,True])
+def test_stem_corpus(threads):
+    samad=Samad(0)
+    documents=[" ".join(WORDS[start:start+7])+"، hello" for start in range(0,3500,7)]
+    expected=[samad.stem_di_many(samad.tokenize(document)) for document in documents]
+    assert list(stem_corpus(documents,"stem_di",workers=2,chunk_size=16,threads=threads))==expected
+    assert list(stem_corpus(documents,"stem_di",workers=1))==expected
+    texts=list(stem_texts(documents,"stem",workers=2,chunk_size=16,threads=threads))
+    assert texts==list(map(samad.stem_text,documents))